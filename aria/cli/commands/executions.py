@@ -101,7 +101,7 @@ def list(service_name,
         logger.info('Listing all executions...')
         filters = {}
 
-    executions_list = model_storage.execution.list(
+    executions_list = model_storage.execution.read_only.list(
         filters=filters,
         sort=utils.storage_sort_param(sort_by, descending)).items
 
@@ -206,10 +206,13 @@ def _run_execution(workflow_runner, logger, model_storage, dry, mark_pattern):
 
     execution_thread.start()
 
-    last_task_id = workflow_runner.execution.logs[-1].id if workflow_runner.execution.logs else 0
+    last_logs = model_storage.log.list(filters=dict(execution_fk=workflow_runner.execution_id),
+                                       sort=dict(id='desc'),
+                                       pagination=dict(size=1, count=False))
+    last_log_id = last_logs[0].id if last_logs else 0
     log_iterator = cli_logger.ModelLogIterator(model_storage,
                                                workflow_runner.execution_id,
-                                               offset=last_task_id)
+                                               offset=last_log_id)
     try:
         while execution_thread.is_alive():
             execution_logging.log_list(log_iterator, mark_pattern=mark_pattern)
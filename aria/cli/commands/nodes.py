@@ -23,6 +23,8 @@ from ..core import aria
 
 
 NODE_COLUMNS = ['id', 'name', 'service_name', 'node_template_name', 'state']
+# Models behind NODE_COLUMNS, loaded along with the nodes instead of one node at a time
+NODE_RELATED = ('service', 'node_template')
 
 
 @aria.group(name='nodes')
@@ -89,6 +91,7 @@ def list(service_name,
 
     nodes_list = model_storage.node.list(
         filters=filters,
-        sort=utils.storage_sort_param(sort_by, descending))
+        sort=utils.storage_sort_param(sort_by, descending),
+        include_related=NODE_RELATED)
 
     table.print_data(NODE_COLUMNS, nodes_list, 'Nodes:')
@@ -35,6 +35,20 @@ from ...orchestrator import topology
 
 DESCRIPTION_FIELD_LENGTH_LIMIT = 20
 SERVICE_COLUMNS = ('id', 'name', 'description', 'service_template_name', 'created_at', 'updated_at')
+# Models shown by the full and graph modes, loaded along with the service instead of one at a time
+SERVICE_FULL_RELATED = (
+    'meta_data', 'inputs', 'outputs', 'groups', 'policies', 'substitution',
+    'workflows', 'workflows.inputs',
+    'nodes', 'nodes.type', 'nodes.node_template', 'nodes.properties', 'nodes.attributes',
+    'nodes.artifacts', 'nodes.capabilities', 'nodes.capabilities.properties',
+    'nodes.interfaces', 'nodes.interfaces.type', 'nodes.interfaces.inputs',
+    'nodes.interfaces.operations', 'nodes.interfaces.operations.inputs',
+    'nodes.outbound_relationships', 'nodes.outbound_relationships.target_node'
+)
+SERVICE_GRAPH_RELATED = (
+    'nodes', 'nodes.inbound_relationships', 'nodes.outbound_relationships',
+    'nodes.outbound_relationships.target_node'
+)
 
 
 @aria.group(name='services')
@@ -62,11 +76,17 @@ def show(service_name, model_storage, mode_full, mode_graph, format_json, format
 
     SERVICE_NAME is the unique name of the service.
     """
-    service = model_storage.service.get_by_name(service_name)
-
     if format_json or format_yaml:
         mode_full = True
 
+    if mode_full:
+        include_related = SERVICE_FULL_RELATED
+    elif mode_graph:
+        include_related = SERVICE_GRAPH_RELATED
+    else:
+        include_related = None
+    service = model_storage.service.get_by_name(service_name, include_related=include_related)
+
     if mode_full:
         consumption.ConsumptionContext()
         if format_json:
@@ -24,7 +24,7 @@ from .config import config
 from .logger import Logging
 from .. import (application_model_storage, application_resource_storage)
 from ..orchestrator.plugin import PluginManager
-from ..storage.sql_mapi import SQLAlchemyModelAPI
+from ..storage.sql_mapi import (SQLAlchemyModelAPI, DEFAULT_SQLITE_PROFILE)
 from ..storage.filesystem_rapi import FileSystemResourceAPI
 
 
@@ -100,7 +100,10 @@ class _Environment(object):
         if not os.path.exists(self._model_storage_dir):
             os.makedirs(self._model_storage_dir)
 
-        initiator_kwargs = dict(base_dir=self._model_storage_dir)
+        # The "compatible" profile is needed if the workdir is on a network file system
+        initiator_kwargs = dict(base_dir=self._model_storage_dir,
+                                profile=os.environ.get('ARIA_STORAGE_PROFILE',
+                                                       DEFAULT_SQLITE_PROFILE))
         return application_model_storage(
             SQLAlchemyModelAPI,
             initiator_kwargs=initiator_kwargs)
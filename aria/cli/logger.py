@@ -118,17 +118,23 @@ class Logging(object):
 
 class ModelLogIterator(object):
 
-    def __init__(self, model_storage, execution_id, filters=None, sort=None, offset=0):
+    def __init__(self, model_storage, execution_id, filters=None, sort=None, offset=0,
+                 batch_size=1000):
         self._last_visited_id = offset
         self._model_storage = model_storage
         self._execution_id = execution_id
         self._additional_filters = filters or {}
         self._sort = sort or {}
+        self._batch_size = batch_size
 
     def __iter__(self):
         filters = dict(execution_fk=self._execution_id, id=dict(gt=self._last_visited_id))
         filters.update(self._additional_filters)
 
-        for log in self._model_storage.log.iter(filters=filters, sort=self._sort):
+        # Logs are read in batches (in ID order), so following a long execution does not load all
+        # its logs at once
+        batch_size = None if self._sort else self._batch_size
+        for log in self._model_storage.log.read_only.iter(filters=filters, sort=self._sort,
+                                                          batch_size=batch_size):
             self._last_visited_id = log.id
             yield log
@@ -60,6 +60,7 @@ class _ExtensionRegistration(object):
     def __init__(self):
         self._registrars = {}
         self._registered_classes = []
+        self._initialized_classes = []
         for attr, value in vars(self.__class__).items():
             try:
                 is_registrar_function = value._registrar_function
@@ -76,14 +77,18 @@ class _ExtensionRegistration(object):
 
     def init(self):
         """
-        Initialize all registrars by calling all registered functions.
+        Initialize all registrars by calling all registered functions. Classes that were already
+        initialized are skipped, so this can be called again after more classes were registered.
         """
-        registered_instances = [cls() for cls in self._registered_classes]
+        classes = [cls for cls in self._registered_classes
+                   if cls not in self._initialized_classes]
+        registered_instances = [cls() for cls in classes]
         for name, registrar in self._registrars.items():
             for instance in registered_instances:
                 registrating_function = getattr(instance, name, None)
                 if registrating_function:
                     registrar.register(registrating_function)
+        self._initialized_classes.extend(classes)
 
 
 class _ParserExtensionRegistration(_ExtensionRegistration):
@@ -19,6 +19,7 @@ formatting.
 """
 
 import logging
+import Queue
 from logging import handlers as logging_handlers
 # NullHandler doesn't exist in < 27. this workaround is from
 # http://docs.python.org/release/2.6/library/logging.html#configuring-logging-for-a-library
@@ -114,11 +115,12 @@ def create_console_log_handler(level=logging.DEBUG, formatter=None):
     return console
 
 
-def create_sqla_log_handler(model, log_cls, execution_id, level=logging.DEBUG):
+def create_sqla_log_handler(model, log_cls, execution_id, level=logging.DEBUG, **kwargs):
 
     # This is needed since the engine and session are entirely new we need to reflect the db
     # schema of the logging model into the engine and session.
-    return _SQLAlchemyHandler(model=model, log_cls=log_cls, execution_id=execution_id, level=level)
+    return _SQLAlchemyHandler(model=model, log_cls=log_cls, execution_id=execution_id, level=level,
+                              **kwargs)
 
 
 class _DefaultConsoleFormat(logging.Formatter):
@@ -160,26 +162,73 @@ def create_file_log_handler(
 
 
 class _SQLAlchemyHandler(logging.Handler):
-    def __init__(self, model, log_cls, execution_id, **kwargs):
+    """
+    Writes log records to the model storage in batches.
+
+    Records are queued by :meth:`emit`, and written in a single transaction once ``batch_size``
+    records were queued or the oldest queued record is ``flush_interval`` seconds old.
+    :meth:`flush` writes the queued records right away; contexts flush their handlers when they
+    close.
+
+    The records are always written by the emitting or flushing thread, never by a thread of the
+    handler's own, since the storage session is not guaranteed to be safe to share between threads
+    (the in-memory test storage shares a single session).
+    """
+
+    def __init__(self, model, log_cls, execution_id, batch_size=100, flush_interval=0.5,
+                 **kwargs):
         logging.Handler.__init__(self, **kwargs)
         self._model = model
         self._cls = log_cls
         self._execution_id = execution_id
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._queue = Queue.Queue()
+        self._oldest_created = None
 
     def emit(self, record):
-        created_at = datetime.strptime(logging.Formatter('%(asctime)s').formatTime(record),
-                                       '%Y-%m-%d %H:%M:%S,%f')
         log = self._cls(
             execution_fk=self._execution_id,
             task_fk=record.task_id,
             level=record.levelname,
             msg=str(record.msg),
-            created_at=created_at,
+            created_at=datetime.fromtimestamp(record.created),
 
             # Not mandatory.
             traceback=getattr(record, 'traceback', None)
         )
-        self._model.log.put(log)
+        self._queue.put(log)
+        # Handler.handle holds the handler lock while emitting
+        if self._oldest_created is None:
+            self._oldest_created = record.created
+        if self._queue.qsize() >= self._batch_size or \
+                record.created - self._oldest_created >= self._flush_interval:
+            self._write()
+
+    def flush(self):
+        self.acquire()
+        try:
+            self._write()
+        finally:
+            self.release()
+
+    def close(self):
+        self.flush()
+        logging.Handler.close(self)
+
+    def _write(self):
+        logs = []
+        while True:
+            try:
+                logs.append(self._queue.get_nowait())
+            except Queue.Empty:
+                break
+        self._oldest_created = None
+        if not logs:
+            return
+        with self._model.batch():
+            for log in logs:
+                self._model.log.put(log)
 
 
 _default_file_formatter = logging.Formatter(
@@ -21,13 +21,12 @@ from sqlalchemy.ext import associationproxy
 from sqlalchemy import (
     Column,
     Integer,
-    Text,
-    PickleType
+    Text
 )
 
 from ..utils import collections, caching
 from ..utils.type import canonical_type_name, full_type_name
-from . import utils, functions
+from . import utils, functions, types
 
 
 class ModelMixin(object):
@@ -163,7 +162,7 @@ class ParameterMixin(TemplateModelMixin, caching.HasCachedMethods):
     :type: :obj:`basestring`
     """)
 
-    _value = Column(PickleType)
+    _value = Column(types.ParameterValue)
 
     @property
     def value(self):
@@ -22,7 +22,8 @@ ARIA modeling service common module
 from sqlalchemy import (
     Column,
     Text,
-    Boolean
+    Boolean,
+    orm
 )
 from sqlalchemy.ext.declarative import declared_attr
 
@@ -534,14 +535,42 @@ class TypeBase(InstanceModelMixin):
         return False
 
     def get_descendant(self, name):
-        if self.name == name:
-            return self
-        for child in self.children:
-            found = child.get_descendant(name)
-            if found is not None:
-                return found
+        index = self._get_type_index()
+        for the_type in index.types_by_name.get(name, ()):
+            if index.is_descendant(the_type, self):
+                return the_type
         return None
 
+    def _get_type_index(self):
+        index = getattr(self, '_type_index', None)
+        if (index is None) or (not index.valid):
+            root = self
+            while root.parent is not None:
+                root = root.parent
+            index = _TypeIndex(root)
+        return index
+
+    @orm.validates('parent', 'children', include_removes=True)
+    def _validate_hierarchy(self, key, value, is_remove):
+        # Keep the type index up to date: new leaf types are added to it, while other changes
+        # invalidate it so that it would be rebuilt on next use
+        if key == 'parent':
+            parent, child = value, self
+        else:
+            parent, child = self, value
+        index = getattr(parent, '_type_index', None)
+        if (not is_remove) and (index is not None) and index.can_add(child):
+            index.add(child, parent)
+        else:
+            for the_type in (parent, child):
+                _TypeIndex.invalidate(the_type)
+        return value
+
+    @orm.validates('name')
+    def _validate_name(self, key, value):
+        _TypeIndex.invalidate(self)
+        return value
+
     def iter_descendants(self):
         for child in self.children:
             yield child
@@ -578,6 +607,62 @@ class TypeBase(InstanceModelMixin):
         return [self] + (self.parent.hierarchy if self.parent else [])
 
 
+class _TypeIndex(object):
+    """
+    Index of a type hierarchy, allowing for constant-time lookups of types by name and of the
+    descendant relation.
+
+    It is created on demand from the root and referenced by all the types in the hierarchy.
+    """
+
+    def __init__(self, root):
+        self.valid = True
+        self.types_by_name = {}
+        self._ancestors = {}
+        self._add_hierarchy(root, frozenset())
+
+    def is_descendant(self, the_type, ancestor):
+        """
+        Whether the type is the ancestor or one of its descendants.
+        """
+        return id(ancestor) in self._ancestors.get(id(the_type), ())
+
+    def can_add(self, the_type):
+        """
+        Whether the type can be added to the index as a new child, rather than invalidating it (only
+        leaf types that are not indexed elsewhere can).
+        """
+        return self.valid and (getattr(the_type, '_type_index', None) in (None, self)) \
+            and not the_type.children
+
+    def add(self, the_type, parent):
+        ancestors = self._ancestors.get(id(the_type))
+        if ancestors is not None:
+            if id(parent) not in ancestors:
+                # Moved within the hierarchy
+                self.valid = False
+            return
+        self._add(the_type, self._ancestors[id(parent)])
+
+    @staticmethod
+    def invalidate(the_type):
+        index = getattr(the_type, '_type_index', None)
+        if index is not None:
+            index.valid = False
+
+    def _add_hierarchy(self, the_type, ancestors):
+        ancestors = self._add(the_type, ancestors)
+        for child in the_type.children:
+            self._add_hierarchy(child, ancestors)
+
+    def _add(self, the_type, ancestors):
+        ancestors = ancestors | frozenset((id(the_type),))
+        self._ancestors[id(the_type)] = ancestors
+        self.types_by_name.setdefault(the_type.name, []).append(the_type)
+        the_type._type_index = self
+        return ancestors
+
+
 class MetadataBase(TemplateModelMixin):
     """
     Custom values associated with the service.
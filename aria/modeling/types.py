@@ -14,21 +14,29 @@
 # limitations under the License.
 
 """
-Allows JSON-serializable collections to be used as SQLAlchemy column types.
+Allows JSON-serializable collections, and parameter values, to be used as SQLAlchemy column types.
 """
 
 import json
+import base64
+import cPickle as pickle
 from collections import namedtuple
 
 from sqlalchemy import (
     TypeDecorator,
     VARCHAR,
+    Text,
     event
 )
 from sqlalchemy.ext import mutable
 from ruamel import yaml
 
+from ..parser.reading.locator import Locator
+from ..utils.collections import OrderedDict
+from ..utils.imports import import_fullname
+from ..utils.type import full_type_name
 from . import exceptions
+from .functions import Function
 
 
 class _MutableType(TypeDecorator):
@@ -73,6 +81,124 @@ class List(_MutableType):
         return list
 
 
+class ParameterValue(TypeDecorator):
+    """
+    Parameter value type for SQLAlchemy columns.
+
+    Values are stored as compact JSON, so that they can be filtered in the database, and are
+    portable between Python versions. Values that JSON cannot represent are stored as single-key
+    objects tagged by their form:
+
+    * ``$tuple``: list of the items
+    * ``$items``: list of key-value pairs, for dicts with non-string keys
+    * ``$locator``: location, line and column of a :class:`~aria.parser.reading.Locator`
+    * ``$function``: class name and state of a :class:`~aria.modeling.functions.Function`; only
+      subclasses of it are loaded
+    * ``$pickle``: base64-encoded pickle of any other value
+
+    Loaded values are equal to the stored ones, but not always of the same types: strings are
+    loaded as :obj:`unicode` (unless they are not UTF-8), dicts as
+    :class:`~aria.utils.collections.OrderedDict` and list subclasses (such as
+    :class:`~aria.utils.collections.FrozenList`) as :obj:`list`.
+
+    Values pickled by older versions of ARIA are still read, and are stored as JSON when their
+    parameter is next written. Anything else that is not valid JSON is reported as malformed. Note
+    that ``$pickle`` values and legacy values are unpickled when loaded, so, as before, the database
+    must be trusted.
+    """
+
+    impl = Text
+
+    @property
+    def python_type(self):
+        return object
+
+    def process_literal_param(self, value, dialect):
+        value = self.process_bind_param(value, dialect)
+        if value is None:
+            return 'NULL'
+        return "'{0}'".format(value.replace("'", "''"))
+
+    def process_bind_param(self, value, dialect):
+        if value is not None:
+            value = json.dumps(_encode_value(value), separators=(',', ':'))
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is not None:
+            if not isinstance(value, basestring):
+                # Binary (e.g. a buffer)
+                value = str(value)
+            if isinstance(value, str) and value.startswith(_LEGACY_PICKLE_PREFIX):
+                return pickle.loads(value)
+            try:
+                value = json.loads(value, object_pairs_hook=_decode_object)
+            except ValueError as e:
+                raise exceptions.ValueFormatException('malformed parameter value', cause=e)
+        return value
+
+
+# Older versions of ARIA stored values with SQLAlchemy's PickleType, whose pickles (of protocol 2
+# and above) start with the PROTO opcode; JSON text never does
+_LEGACY_PICKLE_PREFIX = '\x80'
+
+
+def _encode_value(value):
+    if (value is None) or isinstance(value, (bool, int, long, float, unicode)):
+        return value
+    elif isinstance(value, str):
+        try:
+            value.decode('utf-8')
+            return value
+        except UnicodeDecodeError:
+            pass
+    elif isinstance(value, tuple):
+        return {'$tuple': [_encode_value(v) for v in value]}
+    elif isinstance(value, list):
+        return [_encode_value(v) for v in value]
+    elif isinstance(value, dict):
+        # A single key that starts with "$" could be mistaken for a tag
+        if all(isinstance(k, basestring) for k in value) \
+                and not ((len(value) == 1) and next(iter(value)).startswith('$')):
+            return OrderedDict((k, _encode_value(v)) for k, v in value.iteritems())
+        return {'$items': [[_encode_value(k), _encode_value(v)] for k, v in value.iteritems()]}
+    elif isinstance(value, Locator):
+        # The child locators are only used while parsing
+        return {'$locator': [value.location, value.line, value.column]}
+    elif isinstance(value, Function):
+        return {'$function': [full_type_name(value), _encode_value(vars(value))]}
+    return {'$pickle': base64.b64encode(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))}
+
+
+def _decode_function(value):
+    class_name, state = value
+    cls = import_fullname(class_name)
+    if not (isinstance(cls, type) and issubclass(cls, Function)):
+        raise exceptions.ValueFormatException('not an intrinsic function class: {0}'
+                                              .format(class_name))
+    function = cls.__new__(cls)
+    function.__dict__.update(state)
+    return function
+
+
+_TAG_DECODERS = {
+    '$tuple': tuple,
+    '$items': lambda value: OrderedDict((k, v) for k, v in value),
+    '$locator': lambda value: Locator(*value),
+    '$function': _decode_function,
+    '$pickle': lambda value: pickle.loads(base64.b64decode(value))
+}
+
+
+def _decode_object(pairs):
+    # Nested objects are decoded first, so tagged values are restored bottom-up
+    if len(pairs) == 1:
+        decoder = _TAG_DECODERS.get(pairs[0][0])
+        if decoder is not None:
+            return decoder(pairs[0][1])
+    return OrderedDict(pairs)
+
+
 class _StrictDictMixin(object):
 
     @classmethod
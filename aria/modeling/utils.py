@@ -147,6 +147,27 @@ def merge_parameter_values(provided_values, declared_parameters, model_cls=None)
     return model_parameters
 
 
+def reencode_parameter_values(model_storage, batch_size=1000):
+    """
+    Writes the values of all the parameters in the model storage in the current encoding (see
+    :class:`~aria.modeling.types.ParameterValue`). Values pickled by older versions of ARIA are
+    otherwise only re-encoded when their parameters are next written.
+
+    Note that databases created by older versions of ARIA on PostgreSQL must first have the type of
+    the ``_value`` columns changed to ``text``.
+    """
+    from sqlalchemy.orm.attributes import flag_modified
+    from . import models
+
+    for model_cls in (models.Input, models.Output, models.Configuration, models.Property,
+                      models.Attribute, models.Argument):
+        mapi = getattr(model_storage, model_cls.__modelname__)
+        with model_storage.batch():
+            for parameter in mapi.iter(batch_size=batch_size):
+                flag_modified(parameter, '_value')
+                mapi.update(parameter)
+
+
 def parameters_as_values(the_dict):
     return dict((k, v.value) for k, v in the_dict.iteritems())
 
@@ -113,6 +113,13 @@ class BaseContext(object):
             'deployment_id={self._service_id}, '
             .format(name=self.__class__.__name__, self=self))
 
+    def flush_logs(self):
+        """
+        Writes out the log records buffered by the logger handlers.
+        """
+        for handler in self.logger.handlers:
+            handler.flush()
+
     @contextmanager
     def logging_handlers(self, handlers=None):
         handlers = handlers or []
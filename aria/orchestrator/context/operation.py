@@ -21,6 +21,7 @@ import threading
 from contextlib import contextmanager
 
 import aria
+from aria.storage import sql_mapi
 from aria.utils import file
 from . import common
 
@@ -102,9 +103,14 @@ class BaseOperationContext(common.BaseContext):
                    **kwargs)
 
     def close(self):
+        self.flush_logs()
         if self._destroy_session:
             self.model.log._session.remove()
-            self.model.log._engine.dispose()
+            if self.model.log._read_session is not None:
+                self.model.log._read_session.remove()
+            sql_mapi.dispose_engine(self.model.log._engine)
+            if self.model.log._read_engine is not None:
+                sql_mapi.dispose_engine(self.model.log._read_engine)
 
     @property
     @contextmanager
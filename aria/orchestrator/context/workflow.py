@@ -23,6 +23,14 @@ from contextlib import contextmanager
 from .exceptions import ContextException
 from .common import BaseContext
 
+# Models that workflows commonly use while iterating over nodes, loaded along with the nodes
+# instead of one node at a time
+_NODE_RELATED = (
+    'interfaces', 'interfaces.operations',
+    'outbound_relationships', 'outbound_relationships.target_node',
+    'outbound_relationships.interfaces', 'outbound_relationships.interfaces.operations'
+)
+
 
 class WorkflowContext(BaseContext):
     """
@@ -90,7 +98,8 @@ class WorkflowContext(BaseContext):
         return self.model.node.iter(
             filters={
                 key: getattr(self.service, self.service.name_column_name())
-            }
+            },
+            include_related=_NODE_RELATED
         )
 
     @property
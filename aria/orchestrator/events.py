@@ -24,6 +24,8 @@ sent_task_signal = signal('sent_task_signal')
 start_task_signal = signal('start_task_signal')
 on_success_task_signal = signal('success_task_signal')
 on_failure_task_signal = signal('failure_task_signal')
+# Sent by executors after a task state transition was persisted
+task_state_changed_signal = signal('task_state_changed_signal')
 
 # workflow engine workflow signals:
 start_workflow_signal = signal('start_workflow_signal')
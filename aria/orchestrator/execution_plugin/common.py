@@ -134,7 +134,9 @@ def patch_ctx(ctx):
 
 
 def check_error(ctx, error_check_func=None, reraise=False):
-    _error = ctx._error
+    # ctx is patched by the ctx proxy's own worker thread, which may not have got to it yet if the
+    # script did not use ctx
+    _error = getattr(ctx, '_error', None)
     # this happens when a script calls task.abort/task.retry more than once
     if isinstance(_error, RuntimeError):
         ctx.task.abort(str(_error))
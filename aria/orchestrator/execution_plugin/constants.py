@@ -25,6 +25,7 @@ from . import exceptions
 PYTHON_SCRIPT_FILE_EXTENSION = '.py'
 POWERSHELL_SCRIPT_FILE_EXTENSION = '.ps1'
 DEFAULT_POWERSHELL_EXECUTABLE = 'powershell'
+OUTPUT_TAIL_SIZE = 64 * 1024  # bytes of streamed output to keep for error reporting
 
 # related to both local and ssh
 ILLEGAL_CTX_OPERATION_MESSAGE = 'ctx may only abort or retry once'
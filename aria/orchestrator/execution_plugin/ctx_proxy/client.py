@@ -19,10 +19,12 @@
 """
 
 import argparse
+import httplib
 import json
 import os
+import shlex
 import sys
-import urllib2
+import urlparse
 
 
 # Environment variable for the socket url (used by clients to locate the socket)
@@ -39,14 +41,18 @@ class _RequestError(RuntimeError):
 
 
 def _http_request(socket_url, request, method, timeout):
-    opener = urllib2.build_opener(urllib2.HTTPHandler)
-    request = urllib2.Request(socket_url, data=json.dumps(request))
-    request.get_method = lambda: method
-    response = opener.open(request, timeout=timeout)
-
-    if response.code != 200:
-        raise RuntimeError('Request failed: {0}'.format(response))
-    return json.loads(response.read())
+    # httplib is used directly, rather than urllib2, as it is much quicker to import
+    url = urlparse.urlsplit(socket_url)
+    connection = httplib.HTTPConnection(url.hostname, url.port, timeout=timeout)
+    try:
+        connection.request(method, url.path or '/', body=json.dumps(request),
+                           headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        if response.status != 200:
+            raise RuntimeError('Request failed: {0} {1}'.format(response.status, response.reason))
+        return json.loads(response.read())
+    finally:
+        connection.close()
 
 
 def _client_request(socket_url, args, timeout, method='POST'):
@@ -56,6 +62,27 @@ def _client_request(socket_url, args, timeout, method='POST'):
         method=method,
         timeout=timeout
     )
+    return _get_payload(response)
+
+
+def _client_batch_request(socket_url, args_list, timeout, method='POST'):
+    """
+    Sends many ctx requests at once, returning their responses (stopping at the first that did
+    not succeed). Use :func:`_get_payload` on each response to get its result.
+    """
+    response = _http_request(
+        socket_url=socket_url,
+        request={'batch': [{'args': args} for args in args_list]},
+        method=method,
+        timeout=timeout
+    )
+    if response.get('type') != 'batch':
+        # the whole batch was rejected
+        _get_payload(response)
+    return response['payload']
+
+
+def _get_payload(response):
     payload = response.get('payload')
     response_type = response.get('type')
     if response_type == 'error':
@@ -75,8 +102,16 @@ def _parse_args(args):
     parser.add_argument('--socket-url', default=os.environ.get(CTX_SOCKET_URL))
     parser.add_argument('--json-arg-prefix', default='@')
     parser.add_argument('-j', '--json-output', action='store_true')
+    parser.add_argument('-e', '--expression', action='append', dest='expressions',
+                        help='ctx expression to send in a single batch along with all other '
+                             'expressions (may be repeated); results are written one per line')
+    parser.add_argument('--stdin', action='store_true',
+                        help='read ctx expressions from stdin, one per line, and send them all in '
+                             'a single batch; results are written one per line')
     parser.add_argument('args', nargs='*')
     args = parser.parse_args(args=args)
+    if (args.expressions or args.stdin) and args.args:
+        parser.error('positional arguments cannot be combined with --expression or --stdin')
     if not args.socket_url:
         raise RuntimeError('Missing CTX_SOCKET_URL environment variable '
                            'or socket_url command line argument. (ctx is supposed to be executed '
@@ -93,13 +128,8 @@ def _process_args(json_prefix, args):
     return processed_args
 
 
-def main(args=None):
-    args = _parse_args(args)
-    response = _client_request(
-        args.socket_url,
-        args=_process_args(args.json_arg_prefix, args.args),
-        timeout=args.timeout)
-    if args.json_output:
+def _format_output(response, json_output):
+    if json_output:
         response = json.dumps(response)
     else:
         if response is None:
@@ -108,7 +138,33 @@ def main(args=None):
             response = str(response)
         except UnicodeEncodeError:
             response = unicode(response).encode('utf8')
-    sys.stdout.write(response)
+    return response
+
+
+def _get_expressions(args):
+    expressions = list(args.expressions or ())
+    if args.stdin:
+        expressions.extend(line for line in sys.stdin.read().splitlines() if line.strip())
+    return [_process_args(args.json_arg_prefix, shlex.split(expression))
+            for expression in expressions]
+
+
+def main(args=None):
+    args = _parse_args(args)
+    if args.expressions or args.stdin:
+        responses = _client_batch_request(
+            args.socket_url,
+            args_list=_get_expressions(args),
+            timeout=args.timeout)
+        for response in responses:
+            sys.stdout.write(_format_output(_get_payload(response), args.json_output))
+            sys.stdout.write('\n')
+        return
+    response = _client_request(
+        args.socket_url,
+        args=_process_args(args.json_arg_prefix, args.args),
+        timeout=args.timeout)
+    sys.stdout.write(_format_output(response, args.json_output))
 
 if __name__ == '__main__':
     main()
@@ -17,12 +17,15 @@
 ``ctx`` proxy server implementation.
 """
 
+import contextlib
 import json
 import socket
 import Queue
+import SocketServer
 import StringIO
 import threading
 import traceback
+import uuid
 import wsgiref.simple_server
 
 import bottle
@@ -31,11 +34,9 @@ from aria import modeling
 from .. import exceptions
 
 
-class CtxProxy(object):
+class _CtxServer(object):
 
-    def __init__(self, ctx, ctx_patcher=(lambda *args, **kwargs: None)):
-        self.ctx = ctx
-        self._ctx_patcher = ctx_patcher
+    def __init__(self):
         self.port = _get_unused_port()
         self.socket_url = 'http://localhost:{0}'.format(self.port)
         self.server = None
@@ -48,27 +49,17 @@ class CtxProxy(object):
         class BottleServerAdapter(bottle.ServerAdapter):
             proxy = self
 
-            def close_session(self):
-                self.proxy.ctx.model.log._session.remove()
-
             def run(self, app):
 
-                class Server(wsgiref.simple_server.WSGIServer):
+                # Each connection is handled on a thread of its own, so that a slow request does
+                # not hold back others; requests are processed by the ctx workers
+                class Server(SocketServer.ThreadingMixIn, wsgiref.simple_server.WSGIServer):
                     allow_reuse_address = True
-                    bottle_server = self
+                    daemon_threads = True
 
                     def handle_error(self, request, client_address):
                         pass
 
-                    def serve_forever(self, poll_interval=0.5):
-                        try:
-                            wsgiref.simple_server.WSGIServer.serve_forever(self, poll_interval)
-                        finally:
-                            # Once shutdown is called, we need to close the session.
-                            # If the session is not closed properly, it might raise warnings,
-                            # or even lock the database.
-                            self.bottle_server.close_session()
-
                 class Handler(wsgiref.simple_server.WSGIRequestHandler):
                     def address_string(self):
                         return self.client_address[0]
@@ -88,11 +79,8 @@ class CtxProxy(object):
                 server.serve_forever(poll_interval=0.1)
 
         def serve():
-            # Since task is a thread_local object, we need to patch it inside the server thread.
-            self._ctx_patcher(self.ctx)
-
             bottle_app = bottle.Bottle()
-            bottle_app.post('/', callback=self._request_handler)
+            self._add_routes(bottle_app)
             bottle.run(
                 app=bottle_app,
                 host='localhost',
@@ -109,35 +97,8 @@ class CtxProxy(object):
             self.server.shutdown()
             self.server.server_close()
 
-    def _request_handler(self):
-        request = bottle.request.body.read()  # pylint: disable=no-member
-        response = self._process(request)
-        return bottle.LocalResponse(
-            body=json.dumps(response, cls=modeling.utils.ModelJSONEncoder),
-            status=200,
-            headers={'content-type': 'application/json'}
-        )
-
-    def _process(self, request):
-        try:
-            with self.ctx.model.instrument(*self.ctx.INSTRUMENTATION_FIELDS):
-                payload = _process_request(self.ctx, request)
-                result_type = 'result'
-                if isinstance(payload, exceptions.ScriptException):
-                    payload = dict(message=str(payload))
-                    result_type = 'stop_operation'
-                result = {'type': result_type, 'payload': payload}
-        except Exception as e:
-            traceback_out = StringIO.StringIO()
-            traceback.print_exc(file=traceback_out)
-            payload = {
-                'type': type(e).__name__,
-                'message': str(e),
-                'traceback': traceback_out.getvalue()
-            }
-            result = {'type': 'error', 'payload': payload}
-
-        return result
+    def _add_routes(self, bottle_app):
+        raise NotImplementedError
 
     def __enter__(self):
         return self
@@ -146,6 +107,181 @@ class CtxProxy(object):
         self.close()
 
 
+class CtxProxy(_CtxServer):
+
+    def __init__(self, ctx, ctx_patcher=(lambda *args, **kwargs: None)):
+        self.ctx = ctx
+        self._worker = _CtxWorker(ctx, ctx_patcher)
+        super(CtxProxy, self).__init__()
+
+    def close(self):
+        try:
+            super(CtxProxy, self).close()
+        finally:
+            self._worker.close()
+
+    def _add_routes(self, bottle_app):
+        bottle_app.post('/', callback=self._request_handler)
+
+    def _request_handler(self):
+        request = bottle.request.body.read()  # pylint: disable=no-member
+        return _response(self._worker.process(request))
+
+
+class CtxMultiplexer(_CtxServer):
+    """
+    ``ctx`` proxy server shared by many operations.
+
+    Each operation is given a route of its own (see :meth:`route`), and requests sent to the
+    route's URL are processed against that operation's context. This allows a single server (and
+    a single tunnel to it) to serve concurrent scripts.
+    """
+
+    def __init__(self):
+        self._workers = {}
+        self._workers_lock = threading.Lock()
+        super(CtxMultiplexer, self).__init__()
+
+    @contextlib.contextmanager
+    def route(self, ctx, ctx_patcher=(lambda *args, **kwargs: None)):
+        """
+        Routes requests to ``ctx`` while inside the block.
+
+        :param ctx: operation context
+        :param ctx_patcher: called with ``ctx`` inside the thread that processes its requests
+        :return: the route, to be appended to the server's socket URL
+        """
+        route = '{0}-{1}'.format(ctx.task.id, uuid.uuid4().hex)
+        worker = _CtxWorker(ctx, ctx_patcher)
+        with self._workers_lock:
+            self._workers[route] = worker
+        try:
+            yield route
+        finally:
+            with self._workers_lock:
+                del self._workers[route]
+            worker.close()
+
+    def _add_routes(self, bottle_app):
+        bottle_app.post('/<route>', callback=self._request_handler)
+
+    def _request_handler(self, route):
+        with self._workers_lock:
+            worker = self._workers.get(route)
+        if worker is None:
+            return _response(_encode(_error_result(
+                CtxError('Unknown ctx route: {0}'.format(route)))))
+        request = bottle.request.body.read()  # pylint: disable=no-member
+        return _response(worker.process(request))
+
+
+class _CtxWorker(object):
+    """
+    Processes the requests of a single ctx on a thread of its own.
+
+    The ctx is patched and instrumented once, and its requests are processed one at a time, so
+    that they all see the same thread-local task and database session.
+    """
+
+    def __init__(self, ctx, ctx_patcher):
+        self.ctx = ctx
+        self._ctx_patcher = ctx_patcher
+        self._requests = Queue.Queue()
+        self._thread = threading.Thread(target=self._work)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def process(self, request):
+        """
+        Processes a request and returns its encoded result.
+        """
+        result = Queue.Queue(1)
+        self._requests.put((request, result))
+        while True:
+            try:
+                return result.get(timeout=0.1)
+            except Queue.Empty:
+                if not self._thread.is_alive():
+                    return _encode(_error_result(CtxError('ctx worker is not running')))
+
+    def close(self):
+        self._requests.put(None)
+        self._thread.join()
+
+    def _work(self):
+        try:
+            # Since task is a thread_local object, we need to patch it inside the worker thread.
+            self._ctx_patcher(self.ctx)
+            with self.ctx.model.instrument(*self.ctx.INSTRUMENTATION_FIELDS):
+                for request, result in iter(self._requests.get, None):
+                    result.put(_encode(_process(self.ctx, request)))
+        finally:
+            # If the session is not closed properly, it might raise warnings,
+            # or even lock the database.
+            self.ctx.model.log._session.remove()
+
+
+def _process(ctx, request):
+    try:
+        request = json.loads(request)
+    except Exception as e:
+        return _error_result(e, _format_traceback())
+    if 'batch' in request:
+        # Requests are processed in order, stopping at the first one that does not succeed
+        results = []
+        for batch_request in request['batch']:
+            result = _process_one(ctx, batch_request)
+            results.append(result)
+            if result['type'] != 'result':
+                break
+        return {'type': 'batch', 'payload': results}
+    return _process_one(ctx, request)
+
+
+def _process_one(ctx, request):
+    try:
+        payload = _process_arguments(ctx, request['args'])
+        result_type = 'result'
+        if isinstance(payload, exceptions.ScriptException):
+            payload = dict(message=str(payload))
+            result_type = 'stop_operation'
+        result = {'type': result_type, 'payload': payload}
+    except Exception as e:
+        result = _error_result(e, _format_traceback())
+
+    return result
+
+
+def _error_result(e, traceback_text=''):
+    payload = {
+        'type': type(e).__name__,
+        'message': str(e),
+        'traceback': traceback_text
+    }
+    return {'type': 'error', 'payload': payload}
+
+
+def _format_traceback():
+    traceback_out = StringIO.StringIO()
+    traceback.print_exc(file=traceback_out)
+    return traceback_out.getvalue()
+
+
+def _encode(result):
+    try:
+        return json.dumps(result, cls=modeling.utils.ModelJSONEncoder)
+    except Exception as e:
+        return json.dumps(_error_result(e, _format_traceback()))
+
+
+def _response(body):
+    return bottle.LocalResponse(
+        body=body,
+        status=200,
+        headers={'content-type': 'application/json'}
+    )
+
+
 class CtxError(RuntimeError):
     pass
 
@@ -154,12 +290,6 @@ class CtxParsingError(CtxError):
     pass
 
 
-def _process_request(ctx, request):
-    request = json.loads(request)
-    args = request['args']
-    return _process_arguments(ctx, args)
-
-
 def _process_arguments(obj, args):
     # Modifying?
     try:
@@ -143,6 +143,8 @@ def _get_process(operation, reporter):
             value[k] = _dict_to_list_of_strings(v, 'process.args', reporter)
         elif k == 'env':
             _validate_type(v, dict, 'process.env', reporter)
+        elif k == 'stream_output':
+            value[k] = _coerce_bool(v, 'process.stream_output', reporter)
         else:
             reporter.report('unsupported configuration parameter: "process.{0}"'.format(k),
                             level=reporter.Issue.BETWEEN_TYPES)
@@ -17,9 +17,11 @@
 Local execution of operations.
 """
 
+import collections
 import os
 import subprocess
 import threading
+import Queue
 import StringIO
 
 from . import ctx_proxy
@@ -90,8 +92,15 @@ def _execute_func(script_path, ctx, process, operation_kwargs):
             cwd=process.get('cwd'),
             bufsize=1,
             close_fds=not common.is_windows())
-        stdout_consumer = _OutputConsumer(running_process.stdout)
-        stderr_consumer = _OutputConsumer(running_process.stderr)
+        if process.get('stream_output'):
+            # output is logged as it arrives, and only its tail is kept for error reporting
+            batches = Queue.Queue()
+            stdout_consumer = _OutputConsumer(running_process.stdout, batches, ctx.logger.info)
+            stderr_consumer = _OutputConsumer(running_process.stderr, batches, ctx.logger.warning)
+            _log_output_batches(batches, consumers_count=2)
+        else:
+            stdout_consumer = _OutputConsumer(running_process.stdout)
+            stderr_consumer = _OutputConsumer(running_process.stderr)
         exit_code = running_process.wait()
     stdout_consumer.join()
     stderr_consumer.join()
@@ -107,12 +116,42 @@ def _execute_func(script_path, ctx, process, operation_kwargs):
     return common.check_error(ctx, error_check_func=error_check_func)
 
 
+def _log_output_batches(batches, consumers_count):
+    # Logging is done by the operation thread, as the log storage session might not be safe to
+    # share between threads
+    while consumers_count:
+        batch = batches.get()
+        if batch is None:
+            consumers_count -= 1
+        else:
+            log, text = batch
+            log(text)
+
+
+_READ_SIZE = 64 * 1024
+
+
 class _OutputConsumer(object):
+    """
+    Consumes a process output stream.
+
+    By default the whole output is kept. If ``batches`` is given, the output is instead put on it
+    as ``(log, text)`` batches of whole lines as soon as they are read (followed by ``None`` once
+    the stream is closed), and only its last ``tail_size`` bytes are kept. Lines longer than
+    ``_READ_SIZE`` (e.g. progress bars redrawn with carriage returns) are put in parts.
+    """
 
-    def __init__(self, out):
+    def __init__(self, out, batches=None, log=None, tail_size=constants.OUTPUT_TAIL_SIZE):
         self._out = out
-        self._buffer = StringIO.StringIO()
-        self._consumer = threading.Thread(target=self._consume_output)
+        self._batches = batches
+        self._log = log
+        if batches is None:
+            self._buffer = StringIO.StringIO()
+            target = self._consume_output
+        else:
+            self._buffer = _OutputTail(tail_size)
+            target = self._stream_output
+        self._consumer = threading.Thread(target=target)
         self._consumer.daemon = True
         self._consumer.start()
 
@@ -121,8 +160,47 @@ class _OutputConsumer(object):
             self._buffer.write(line)
         self._out.close()
 
+    def _stream_output(self):
+        try:
+            partial_line = b''
+            # each read returns whatever output is available, which makes for a natural batch
+            for chunk in iter(lambda: os.read(self._out.fileno(), _READ_SIZE), b''):
+                self._buffer.write(chunk)
+                lines, _, partial_line = (partial_line + chunk).rpartition(b'\n')
+                if lines:
+                    self._batches.put((self._log, lines))
+                if len(partial_line) >= _READ_SIZE:
+                    # Output without newlines must not be accumulated
+                    self._batches.put((self._log, partial_line))
+                    partial_line = b''
+            if partial_line:
+                self._batches.put((self._log, partial_line))
+            self._out.close()
+        finally:
+            self._batches.put(None)
+
     def read_output(self):
         return self._buffer.getvalue()
 
     def join(self):
         self._consumer.join()
+
+
+class _OutputTail(object):
+    """
+    Keeps the last ``size`` bytes written to it.
+    """
+
+    def __init__(self, size):
+        self._size = size
+        self._chunks = collections.deque()
+        self._length = 0
+
+    def write(self, chunk):
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+        while self._length - len(self._chunks[0]) >= self._size:
+            self._length -= len(self._chunks.popleft())
+
+    def getvalue(self):
+        return b''.join(self._chunks)[-self._size:]
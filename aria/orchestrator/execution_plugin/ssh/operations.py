@@ -20,12 +20,17 @@ Utilities for running commands remotely over SSH.
 import os
 import random
 import string
+import tarfile
 import tempfile
+import threading
 import StringIO
+from contextlib import closing
 
 import fabric.api
 import fabric.context_managers
 import fabric.contrib.files
+import fabric.network
+import fabric.state
 
 from .. import constants
 from .. import exceptions
@@ -38,6 +43,15 @@ _PROXY_CLIENT_PATH = ctx_proxy.client.__file__
 if _PROXY_CLIENT_PATH.endswith('.pyc'):
     _PROXY_CLIENT_PATH = _PROXY_CLIENT_PATH[:-1]
 
+# Remote ctx client locations (normalized host string, ctx path) known to be uploaded in this
+# process; Fabric's connection cache keeps the matching SSH connections open between operations
+_uploaded_ctx_clients = set()
+_uploaded_ctx_clients_lock = threading.Lock()
+
+# Long-lived ctx multiplexers and their reverse tunnels, by normalized host string
+_ctx_tunnels = {}
+_ctx_tunnels_lock = threading.Lock()
+
 
 def run_commands(ctx, commands, fabric_env, use_sudo, hide_output, **_):
     """Runs the provider 'commands' in sequence
@@ -47,6 +61,7 @@ def run_commands(ctx, commands, fabric_env, use_sudo, hide_output, **_):
     """
     with fabric.api.settings(_hide_output(ctx, groups=hide_output),
                              **_fabric_env(ctx, fabric_env, warn_only=True)):
+        _drop_stale_connection()
         for command in commands:
             ctx.logger.info('Running command: {0}'.format(command))
             run = fabric.api.sudo if use_sudo else fabric.api.run
@@ -65,41 +80,115 @@ def run_script(ctx, script_path, fabric_env, process, use_sudo, hide_output, **k
                    local_script_path=common.download_script(ctx, script_path))
     with fabric.api.settings(_hide_output(ctx, groups=hide_output),
                              **_fabric_env(ctx, fabric_env, warn_only=False)):
+        _drop_stale_connection()
         # the remote host must have the ctx before running any fabric scripts
-        if not fabric.contrib.files.exists(paths.remote_ctx_path):
-            # there may be race conditions with other operations that
-            # may be running in parallel, so we pass -p to make sure
-            # we get 0 exit code if the directory already exists
-            fabric.api.run('mkdir -p {0} && mkdir -p {1}'.format(paths.remote_scripts_dir,
-                                                                 paths.remote_work_dir))
-            # this file has to be present before using ctx
-            fabric.api.put(_PROXY_CLIENT_PATH, paths.remote_ctx_path)
+        _upload_ctx_client(paths)
         process = common.create_process_config(
             script_path=paths.remote_script_path,
             process=process,
             operation_kwargs=kwargs,
             quote_json_env_vars=True)
-        fabric.api.put(paths.local_script_path, paths.remote_script_path)
-        with ctx_proxy.server.CtxProxy(ctx, _patch_ctx) as proxy:
-            local_port = proxy.port
+        ctx_tunnel = _get_ctx_tunnel()
+        with ctx_tunnel.multiplexer.route(ctx, _patch_ctx) as route:
             with fabric.context_managers.cd(process.get('cwd', paths.remote_work_dir)):  # pylint: disable=not-context-manager
-                with tunnel.remote(ctx, local_port=local_port) as remote_port:
-                    local_socket_url = proxy.socket_url
-                    remote_socket_url = local_socket_url.replace(str(local_port), str(remote_port))
-                    env_script = _write_environment_script_file(
-                        process=process,
-                        paths=paths,
-                        local_socket_url=local_socket_url,
-                        remote_socket_url=remote_socket_url)
-                    fabric.api.put(env_script, paths.remote_env_script_path)
-                    try:
-                        command = 'source {0} && {1}'.format(paths.remote_env_script_path,
-                                                             process['command'])
-                        run = fabric.api.sudo if use_sudo else fabric.api.run
-                        run(command)
-                    except exceptions.TaskException:
-                        return common.check_error(ctx, reraise=True)
-            return common.check_error(ctx)
+                local_socket_url = '{0}/{1}'.format(ctx_tunnel.multiplexer.socket_url, route)
+                remote_socket_url = 'http://localhost:{0}/{1}'.format(ctx_tunnel.remote_port,
+                                                                      route)
+                env_script = _write_environment_script_file(
+                    process=process,
+                    paths=paths,
+                    local_socket_url=local_socket_url,
+                    remote_socket_url=remote_socket_url)
+                # the script and its environment are sent in a single transfer, and unpacked
+                # by the same command that runs the script
+                fabric.api.put(_write_bundle_file(paths, env_script), paths.remote_bundle_path)
+                try:
+                    command = ('tar -xf {0} -C {1} --no-same-owner && rm -f {0} && source {2} && '
+                               '{3}').format(
+                        paths.remote_bundle_path,
+                        paths.remote_scripts_dir,
+                        paths.remote_env_script_path,
+                        process['command'])
+                    run = fabric.api.sudo if use_sudo else fabric.api.run
+                    run(command)
+                except exceptions.TaskException:
+                    return common.check_error(ctx, reraise=True)
+        return common.check_error(ctx)
+
+
+def _drop_stale_connection():
+    """
+    Removes the cached connection to the current host if it is no longer active, so that Fabric
+    reconnects on its next use.
+
+    Fabric keeps connections open for the lifetime of the process, so operations running in the
+    same executor worker reuse a single SSH connection per host.
+    """
+    connections = fabric.state.connections
+    host_string = fabric.state.env.host_string
+    if host_string and host_string in connections:
+        transport = connections[host_string].get_transport()
+        if (transport is None) or (not transport.is_active()):
+            del connections[host_string]
+
+
+def _upload_ctx_client(paths):
+    """Makes sure the ctx client is on the remote host, checking each host only once."""
+    key = (fabric.network.normalize_to_string(fabric.state.env.host_string), paths.remote_ctx_path)
+    with _uploaded_ctx_clients_lock:
+        if key in _uploaded_ctx_clients:
+            return
+    if not fabric.contrib.files.exists(paths.remote_ctx_path):
+        # there may be race conditions with other operations that
+        # may be running in parallel, so we pass -p to make sure
+        # we get 0 exit code if the directory already exists
+        fabric.api.run('mkdir -p {0} && mkdir -p {1}'.format(paths.remote_scripts_dir,
+                                                             paths.remote_work_dir))
+        # this file has to be present before using ctx
+        fabric.api.put(_PROXY_CLIENT_PATH, paths.remote_ctx_path)
+    with _uploaded_ctx_clients_lock:
+        _uploaded_ctx_clients.add(key)
+
+
+def _get_ctx_tunnel():
+    """
+    Returns the ctx tunnel of the current host connection, creating it if needed.
+
+    Scripts running on the same host share a single ctx multiplexer and a single reverse tunnel
+    to it, so neither has to be started per operation.
+    """
+    host_string = fabric.network.normalize_to_string(fabric.state.env.host_string)
+    transport = fabric.state.connections[fabric.state.env.host_string].get_transport()
+    with _ctx_tunnels_lock:
+        ctx_tunnel = _ctx_tunnels.get(host_string)
+        if (ctx_tunnel is not None) and (ctx_tunnel.transport is not transport):
+            # the connection was replaced, so the tunnel went down with the old one
+            ctx_tunnel.close()
+            ctx_tunnel = None
+        if ctx_tunnel is None:
+            ctx_tunnel = _CtxTunnel(transport)
+            _ctx_tunnels[host_string] = ctx_tunnel
+        return ctx_tunnel
+
+
+class _CtxTunnel(object):
+
+    def __init__(self, transport):
+        self.transport = transport
+        self.multiplexer = ctx_proxy.server.CtxMultiplexer()
+        try:
+            self._tunnel = tunnel.remote(None, local_port=self.multiplexer.port)
+            self.remote_port = self._tunnel.__enter__()
+        except BaseException:
+            self.multiplexer.close()
+            raise
+
+    def close(self):
+        try:
+            if self.transport.is_active():
+                self._tunnel.__exit__(None, None, None)
+        finally:
+            self.multiplexer.close()
 
 
 def _patch_ctx(ctx):
@@ -178,6 +267,30 @@ def _write_environment_script_file(process, paths, local_socket_url, remote_sock
     return env_script
 
 
+def _write_bundle_file(paths, env_script):
+    bundle = StringIO.StringIO()
+    with closing(tarfile.open(fileobj=bundle, mode='w')) as tar:
+        script_info = tar.gettarinfo(paths.local_script_path,
+                                     arcname=os.path.basename(paths.remote_script_path))
+        _reset_owner(script_info)
+        with open(paths.local_script_path, 'rb') as script:
+            tar.addfile(script_info, script)
+        env_script_info = tarfile.TarInfo(os.path.basename(paths.remote_env_script_path))
+        env_script_info.size = len(env_script.getvalue())
+        env_script_info.mode = 0o644
+        _reset_owner(env_script_info)
+        env_script.seek(0)
+        tar.addfile(env_script_info, env_script)
+    bundle.seek(0)
+    return bundle
+
+
+def _reset_owner(tar_info):
+    # The local owner means nothing on the remote host (and is kept when extracting as root)
+    tar_info.uid = tar_info.gid = 0
+    tar_info.uname = tar_info.gname = ''
+
+
 class _Paths(object):
 
     def __init__(self, base_dir, local_script_path):
@@ -193,3 +306,4 @@ class _Paths(object):
         self.remote_env_script_path = '{0}/env-{1}'.format(self.remote_scripts_dir,
                                                            remote_path_suffix)
         self.remote_script_path = '{0}/{1}'.format(self.remote_scripts_dir, remote_path_suffix)
+        self.remote_bundle_path = '{0}/{1}.tar'.format(self.remote_scripts_dir, remote_path_suffix)
@@ -31,7 +31,12 @@ import fabric.thread_handling
 
 @contextlib.contextmanager
 def remote(ctx, local_port, remote_port=0, local_host='localhost', remote_bind_address='127.0.0.1'):
-    """Create a tunnel forwarding a locally-visible port to the remote target."""
+    """
+    Create a tunnel forwarding a locally-visible port to the remote target.
+
+    ``ctx`` is used to abort the task if the local port cannot be reached; tunnels that outlive a
+    single task should pass ``None``.
+    """
     sockets = []
     channels = []
     thread_handlers = []
@@ -54,9 +59,16 @@ def remote(ctx, local_port, remote_port=0, local_host='localhost', remote_bind_a
         # guarantees this will not happen.
         channel.fileno()
 
-        channels.append(channel)
+        # a tunnel may be long-lived, so we let go of forwarders that are already done (failed ones
+        # are kept so that their errors are raised when the tunnel is closed)
+        for i in reversed(range(len(thread_handlers))):
+            thread_handler = thread_handlers[i]
+            if (not thread_handler.thread.is_alive()) and (thread_handler.exception is None):
+                thread_handlers.pop(i)
+                sockets.pop(i)
+                channels.pop(i)
+
         sock = socket.socket()
-        sockets.append(sock)
 
         try:
             sock.connect((local_host, local_port))
@@ -67,10 +79,15 @@ def remote(ctx, local_port, remote_port=0, local_host='localhost', remote_bind_a
                 close_error = ' (While trying to close channel: {0})'.format(ex2)
             else:
                 close_error = ''
-            ctx.task.abort('[{0}] rtunnel: cannot connect to {1}:{2} ({3}){4}'
-                           .format(fabric.api.env.host_string, local_host, local_port, e,
-                                   close_error))
+            sock.close()
+            message = '[{0}] rtunnel: cannot connect to {1}:{2} ({3}){4}'.format(
+                fabric.api.env.host_string, local_host, local_port, e, close_error)
+            if ctx is None:
+                raise RuntimeError(message)
+            ctx.task.abort(message)
 
+        channels.append(channel)
+        sockets.append(sock)
         thread_handler = fabric.thread_handling.ThreadHandler('fwd', _forwarder, channel, sock)
         thread_handlers.append(thread_handler)
 
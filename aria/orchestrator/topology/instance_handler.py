@@ -16,6 +16,8 @@
 from ... parser.modeling import context
 from ... modeling import models, functions
 from ... utils import formatting
+from ... utils.collections import OrderedDict
+from ... utils.threading import FixedThreadPoolExecutor
 from .. import execution_plugin
 from .. import decorators
 from . import common
@@ -179,20 +181,23 @@ class Node(common.ActorHandlerBase):
                 satisfied = False
         return satisfied
 
-    def satisfy_requirements(self):
+    def satisfy_requirements(self, targets=None, index=None):
+        """
+        :param targets: targets already found for node template requirements, as returned from
+         :meth:`find_targets`
+        :param index: index of candidate targets (built if not provided)
+        """
         satisfied = True
-        for requirement_template in self._model.node_template.requirement_templates:
-
-            # Since we try and satisfy requirements, which are node template bound, and use that
-            # information in the creation of the relationship, Some requirements may have been
-            # satisfied by a previous run on that node template.
-            # The entire mechanism of satisfying requirements needs to be refactored.
-            if any(rel.requirement_template == requirement_template
-                   for rel in self._model.outbound_relationships):
-                continue
-
+        for requirement_template in self._get_unsatisfied_requirement_templates():
             # Find target template
-            target_node_template, target_node_capability = self._find_target(requirement_template)
+            key = (self._model.node_template, requirement_template)
+            if (targets is not None) and (key in targets):
+                target_node_template, target_node_capability = targets[key]
+            else:
+                if index is None:
+                    index = _TargetIndex(self._model.node_template.service_template)
+                target_node_template, target_node_capability = \
+                    self._find_target(requirement_template, index)
             if target_node_template is not None:
                 satisfied = self._satisfy_capability(
                     target_node_capability, target_node_template, requirement_template)
@@ -203,6 +208,30 @@ class Node(common.ActorHandlerBase):
                 satisfied = False
         return satisfied
 
+    def find_targets(self, index, requirement_templates=None):
+        """
+        Finds the targets of the node template's requirements without modifying any model, so it
+        can be called concurrently.
+
+        :returns: dict of ``(node template, requirement template)`` to
+         ``(target node template, target capability template)``
+        """
+        if requirement_templates is None:
+            requirement_templates = self._get_unsatisfied_requirement_templates()
+        return dict(((self._model.node_template, requirement_template),
+                     self._find_target(requirement_template, index))
+                    for requirement_template in requirement_templates)
+
+    def _get_unsatisfied_requirement_templates(self):
+        # Since we try and satisfy requirements, which are node template bound, and use that
+        # information in the creation of the relationship, Some requirements may have been
+        # satisfied by a previous run on that node template.
+        # The entire mechanism of satisfying requirements needs to be refactored.
+        return [requirement_template
+                for requirement_template in self._model.node_template.requirement_templates
+                if not any(rel.requirement_template == requirement_template
+                           for rel in self._model.outbound_relationships)]
+
     def _satisfy_capability(self, target_node_capability, target_node_template,
                             requirement_template):
         # Find target nodes
@@ -251,7 +280,7 @@ class Node(common.ActorHandlerBase):
                 level=self._topology.Issue.BETWEEN_INSTANCES)
             return False
 
-    def _find_target(self, requirement_template):
+    def _find_target(self, requirement_template, index):
         # We might already have a specific node template from the requirement template, so
         # we'll just verify it
         if requirement_template.target_node_template is not None:
@@ -276,12 +305,8 @@ class Node(common.ActorHandlerBase):
 
         # Find first node that matches the type
         elif requirement_template.target_node_type is not None:
-            for target_node_template in \
-                    self._model.node_template.service_template.node_templates.itervalues():
-                if requirement_template.target_node_type.get_descendant(
-                        target_node_template.type.name) is None:
-                    continue
-
+            for target_node_template in index.get_node_templates(
+                    requirement_template.target_node_type):
                 if not self._model.node_template.is_target_node_template_valid(
                         target_node_template):
                     continue
@@ -296,8 +321,8 @@ class Node(common.ActorHandlerBase):
 
         # Find the first node which has a capability of the required type
         elif requirement_template.target_capability_type is not None:
-            for target_node_template in \
-                    self._model.node_template.service_template.node_templates.itervalues():
+            for target_node_template in index.get_capability_node_templates(
+                    requirement_template.target_capability_type):
                 target_node_capability = \
                     self._get_capability(requirement_template, target_node_template)
                 if target_node_capability:
@@ -534,11 +559,76 @@ class Service(common.ActorHandlerBase):
                 satisfied = False
         return satisfied
 
-    def satisfy_requirements(self):
-        return all(self._topology.satisfy_requirements(node)
+    def satisfy_requirements(self, threads=1):
+        """
+        :param threads: number of threads with which to find requirement targets concurrently;
+         relationships are then created in node order, so the result does not depend on it
+        """
+        index = _TargetIndex(self._model.service_template)
+
+        # Targets depend only on node templates, so each requirement is looked up only once
+        requirements = OrderedDict()
+        for node in self._model.nodes.itervalues():
+            node_handler = Node(self._topology, node)
+            for requirement_template in node_handler._get_unsatisfied_requirement_templates():
+                requirements.setdefault((node.node_template, requirement_template), node)
+
+        targets = {}
+        if (threads > 1) and (len(requirements) > 1):
+            with FixedThreadPoolExecutor(size=threads) as executor:
+                for (_, requirement_template), node in requirements.iteritems():
+                    executor.submit(Node(self._topology, node).find_targets, index,
+                                    [requirement_template])
+                executor.drain()
+                executor.raise_first()
+                for node_targets in executor.returns:
+                    targets.update(node_targets)
+        else:
+            for (_, requirement_template), node in requirements.iteritems():
+                targets.update(Node(self._topology, node).find_targets(index,
+                                                                       [requirement_template]))
+
+        return all(self._topology.satisfy_requirements(node, targets=targets, index=index)
                    for node in self._model.nodes.values())
 
 
+class _TargetIndex(object):
+    """
+    Index of the node templates of a service template that are candidate requirement targets.
+
+    Node templates are indexed by the names of their type and its ancestors, and by those of their
+    capability types, in the order of the service template, so that finding candidates is a lookup.
+    """
+
+    def __init__(self, service_template):
+        self._node_templates_by_type_name = {}
+        self._node_templates_by_capability_type_name = {}
+        for node_template in service_template.node_templates.itervalues():
+            for the_type in node_template.type.hierarchy:
+                self._node_templates_by_type_name.setdefault(the_type.name, []) \
+                    .append(node_template)
+
+            capability_type_names = set()
+            for capability_template in node_template.capability_templates.itervalues():
+                capability_type_names.update(the_type.name
+                                             for the_type in capability_template.type.hierarchy)
+            for capability_type_name in capability_type_names:
+                self._node_templates_by_capability_type_name.setdefault(capability_type_name, []) \
+                    .append(node_template)
+
+    def get_node_templates(self, node_type):
+        """
+        Node templates of the node type or of its descendants.
+        """
+        return self._node_templates_by_type_name.get(node_type.name, ())
+
+    def get_capability_node_templates(self, capability_type):
+        """
+        Node templates with capabilities of the capability type or of its descendants.
+        """
+        return self._node_templates_by_capability_type_name.get(capability_type.name, ())
+
+
 class Substitution(common.InstanceHandlerBase):
     def coerce(self, **kwargs):
         self._topology.coerce(self._model.mappings, **kwargs)
@@ -41,7 +41,8 @@ class WorkflowRunner(object):
                  execution_id=None, retry_failed_tasks=False,
                  service_id=None, workflow_name=None, inputs=None, executor=None,
                  task_max_attempts=DEFAULT_TASK_MAX_ATTEMPTS,
-                 task_retry_interval=DEFAULT_TASK_RETRY_INTERVAL):
+                 task_retry_interval=DEFAULT_TASK_RETRY_INTERVAL,
+                 max_concurrent_tasks=None, concurrency_limits=None):
         """
         Manages a single workflow execution on a given service.
 
@@ -55,6 +56,9 @@ class WorkflowRunner(object):
          :class:`~aria.orchestrator.workflows.executor.process.ProcessExecutor` instance
         :param task_max_attempts: maximum attempts of repeating each failing task
         :param task_retry_interval: retry interval between retry attempts of a failing task
+        :param max_concurrent_tasks: maximum number of tasks running at once
+        :param concurrency_limits: maximum number of tasks running at once per ``host``,
+         ``plugin`` or ``operation``
         """
 
         if not (execution_id or (workflow_name and service_id)):
@@ -103,7 +107,9 @@ class WorkflowRunner(object):
             compiler = graph_compiler.GraphCompiler(self._workflow_context, executor.__class__)
             compiler.compile(self._tasks_graph)
 
-        self._engine = engine.Engine(executors={executor.__class__: executor})
+        self._engine = engine.Engine(executors={executor.__class__: executor},
+                                     max_concurrent_tasks=max_concurrent_tasks,
+                                     concurrency_limits=concurrency_limits)
 
     @property
     def execution_id(self):
@@ -17,9 +17,7 @@
 Task graph.
 """
 
-from collections import Iterable
-
-from networkx import DiGraph, topological_sort
+from collections import Iterable, deque
 
 from ....utils.uuid import generate_uuid
 from . import task as api_task
@@ -32,6 +30,14 @@ class TaskNotInGraphError(Exception):
     pass
 
 
+class TaskGraphCycleError(Exception):
+    """
+    An error representing a scenario where the graph's dependencies contain a cycle, so it cannot
+    be sorted topologically.
+    """
+    pass
+
+
 def _filter_out_empty_tasks(func=None):
     if func is None:
         return lambda f: _filter_out_empty_tasks(func=f)
@@ -49,11 +55,12 @@ class TaskGraph(object):
     def __init__(self, name):
         self.name = name
         self._id = generate_uuid(variant='uuid')
-        self._graph = DiGraph()
+        self._nodes = []  # by index, with None for removed tasks
+        self._indexes = {}  # task ID to index
 
     def __repr__(self):
-        return '{name}(id={self._id}, name={self.name}, graph={self._graph!r})'.format(
-            name=self.__class__.__name__, self=self)
+        return '{name}(id={self._id}, name={self.name}, tasks={tasks_count})'.format(
+            name=self.__class__.__name__, self=self, tasks_count=len(self._indexes))
 
     @property
     def id(self):
@@ -69,8 +76,9 @@ class TaskGraph(object):
         """
         Iterator over tasks in the graph.
         """
-        for _, data in self._graph.nodes_iter(data=True):
-            yield data['task']
+        for node in self._nodes:
+            if node is not None:
+                yield node.task
 
     def topological_order(self, reverse=False):
         """
@@ -78,9 +86,30 @@ class TaskGraph(object):
 
         :param reverse: whether to reverse the sort
         :return: list which represents the topological sort
+        :raises ~aria.orchestrator.workflows.api.task_graph.TaskGraphCycleError: if the
+         dependencies contain a cycle
         """
-        for task_id in topological_sort(self._graph, reverse=reverse):
-            yield self.get_task(task_id)
+        # Kahn's algorithm: dependents come before their dependencies, unless reversed
+        nodes = self._nodes
+        incoming, outgoing = ('dependencies', 'dependents') if reverse \
+            else ('dependents', 'dependencies')
+
+        counts = [len(getattr(node, incoming)) if node is not None else None for node in nodes]
+        ready = deque(index for index, count in enumerate(counts) if count == 0)
+        order = []
+        while ready:
+            node = nodes[ready.popleft()]
+            order.append(node.task)
+            for index in getattr(node, outgoing):
+                counts[index] -= 1
+                if counts[index] == 0:
+                    ready.append(index)
+
+        if len(order) != len(self._indexes):
+            raise TaskGraphCycleError('Task graph contains a cycle: {0}'.format(self.name))
+
+        for task in order:
+            yield task
 
     def get_dependencies(self, dependent_task):
         """
@@ -92,8 +121,8 @@ class TaskGraph(object):
         """
         if not self.has_tasks(dependent_task):
             raise TaskNotInGraphError('Task id: {0}'.format(dependent_task.id))
-        for _, dependency_id in self._graph.out_edges_iter(dependent_task.id):
-            yield self.get_task(dependency_id)
+        for index in self._get_node(dependent_task.id).dependencies:
+            yield self._nodes[index].task
 
     def get_dependents(self, dependency_task):
         """
@@ -105,8 +134,8 @@ class TaskGraph(object):
         """
         if not self.has_tasks(dependency_task):
             raise TaskNotInGraphError('Task id: {0}'.format(dependency_task.id))
-        for dependent_id, _ in self._graph.in_edges_iter(dependency_task.id):
-            yield self.get_task(dependent_id)
+        for index in self._get_node(dependency_task.id).dependents:
+            yield self._nodes[index].task
 
     # task methods
 
@@ -118,10 +147,9 @@ class TaskGraph(object):
         :raises ~aria.orchestrator.workflows.api.task_graph.TaskNotInGraphError: if no task found in
          the graph with the given ID
         """
-        if not self._graph.has_node(task_id):
+        if task_id not in self._indexes:
             raise TaskNotInGraphError('Task id: {0}'.format(task_id))
-        data = self._graph.node[task_id]
-        return data['task']
+        return self._get_node(task_id).task
 
     @_filter_out_empty_tasks
     def add_tasks(self, *tasks):
@@ -139,7 +167,8 @@ class TaskGraph(object):
             if isinstance(task, Iterable):
                 return_tasks += self.add_tasks(*task)
             elif not self.has_tasks(task):
-                self._graph.add_node(task.id, task=task)
+                self._indexes[task.id] = len(self._nodes)
+                self._nodes.append(_TaskNode(task))
                 return_tasks.append(task)
 
         return return_tasks
@@ -159,7 +188,13 @@ class TaskGraph(object):
             if isinstance(task, Iterable):
                 return_tasks += self.remove_tasks(*task)
             elif self.has_tasks(task):
-                self._graph.remove_node(task.id)
+                index = self._indexes.pop(task.id)
+                node = self._nodes[index]
+                for dependency_index in node.dependencies:
+                    self._nodes[dependency_index].dependents.discard(index)
+                for dependent_index in node.dependents:
+                    self._nodes[dependent_index].dependencies.discard(index)
+                self._nodes[index] = None
                 return_tasks.append(task)
 
         return return_tasks
@@ -180,7 +215,7 @@ class TaskGraph(object):
             if isinstance(task, Iterable):
                 return_value &= self.has_tasks(*task)
             else:
-                return_value &= self._graph.has_node(task.id)
+                return_value &= task.id in self._indexes
 
         return return_value
 
@@ -213,7 +248,10 @@ class TaskGraph(object):
                 for dependency_task in dependency:
                     self.add_dependency(dependent, dependency_task)
             else:
-                self._graph.add_edge(dependent.id, dependency.id)
+                dependent_index = self._indexes[dependent.id]
+                dependency_index = self._indexes[dependency.id]
+                self._nodes[dependent_index].dependencies.add(dependency_index)
+                self._nodes[dependency_index].dependents.add(dependent_index)
 
     def has_dependency(self, dependent, dependency):
         """
@@ -244,7 +282,8 @@ class TaskGraph(object):
                 for dependency_task in dependency:
                     return_value &= self.has_dependency(dependent, dependency_task)
             else:
-                return_value &= self._graph.has_edge(dependent.id, dependency.id)
+                return_value &= \
+                    self._indexes[dependency.id] in self._get_node(dependent.id).dependencies
 
         return return_value
 
@@ -276,7 +315,13 @@ class TaskGraph(object):
             for dependency_task in dependency:
                 self.remove_dependency(dependent, dependency_task)
         else:
-            self._graph.remove_edge(dependent.id, dependency.id)
+            dependent_index = self._indexes[dependent.id]
+            dependency_index = self._indexes[dependency.id]
+            self._nodes[dependent_index].dependencies.discard(dependency_index)
+            self._nodes[dependency_index].dependents.discard(dependent_index)
+
+    def _get_node(self, task_id):
+        return self._nodes[self._indexes[task_id]]
 
     @_filter_out_empty_tasks
     def sequence(self, *tasks):
@@ -293,3 +338,16 @@ class TaskGraph(object):
                 self.add_dependency(tasks[i], tasks[i-1])
 
         return tasks
+
+
+class _TaskNode(object):
+    """
+    A task in the graph, with the indexes of its dependencies and dependents.
+    """
+
+    __slots__ = ('task', 'dependencies', 'dependents')
+
+    def __init__(self, task):
+        self.task = task
+        self.dependencies = set()
+        self.dependents = set()
@@ -17,4 +17,4 @@
 Workflow core.
 """
 
-from . import engine
+from . import engine, scheduling
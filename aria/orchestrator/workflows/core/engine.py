@@ -17,16 +17,21 @@
 Workflow execution.
 """
 
+import heapq
+import itertools
 import time
+import Queue
 from datetime import datetime
 
 from aria import logger
+from aria.utils.collections import OrderedDict
 from aria.modeling import models
 from aria.orchestrator import events
 from aria.orchestrator.context import operation
 
 from .. import exceptions
 from ..executor.base import StubTaskExecutor
+from .scheduling import CriticalPathPolicy, FifoPolicy, ConcurrencyLimiter
 # Import required so all signals are registered
 from . import events_handler  # pylint: disable=unused-import
 
@@ -34,12 +39,33 @@ from . import events_handler  # pylint: disable=unused-import
 class Engine(logger.LoggerMixin):
     """
     Executes workflows.
+
+    :param executors: dict of executor classes to executor instances
+    :param event_driven: if ``True`` (the default) the engine blocks on task state changes pushed
+     by the executors, and only re-reads the tasks that changed; if ``False`` it polls the storage
+     for the state of all tasks every ``poll_interval`` seconds
+    :param poll_interval: seconds between storage polls (when not event driven)
+    :param cancel_check_interval: maximum seconds between cancel checks (when event driven)
+    :param scheduling_policy: class of the policy deciding the order in which ready tasks are
+     dispatched (defaults to
+     :class:`~aria.orchestrator.workflows.core.scheduling.CriticalPathPolicy`)
+    :param max_concurrent_tasks: maximum number of tasks running at once (``None`` for no limit)
+    :param concurrency_limits: maximum number of tasks running at once per ``host``, ``plugin``
+     or ``operation`` (see :class:`~aria.orchestrator.workflows.core.scheduling.ConcurrencyLimiter`)
     """
 
-    def __init__(self, executors, **kwargs):
+    def __init__(self, executors, event_driven=True, poll_interval=0.1, cancel_check_interval=1,
+                 scheduling_policy=CriticalPathPolicy, max_concurrent_tasks=None,
+                 concurrency_limits=None, **kwargs):
         super(Engine, self).__init__(**kwargs)
         self._executors = executors.copy()
         self._executors.setdefault(StubTaskExecutor, StubTaskExecutor())
+        self._event_driven = event_driven
+        self._poll_interval = poll_interval
+        self._cancel_check_interval = cancel_check_interval
+        self._scheduling_policy = scheduling_policy
+        self._max_concurrent_tasks = max_concurrent_tasks
+        self._concurrency_limits = concurrency_limits
 
     def execute(self, ctx, resuming=False, retry_failed=False):
         """
@@ -48,9 +74,17 @@ class Engine(logger.LoggerMixin):
         if resuming:
             events.on_resume_workflow_signal.send(ctx, retry_failed=retry_failed)
 
-        tasks_tracker = _TasksTracker(ctx)
+        tasks_tracker = _TasksTracker(
+            ctx,
+            event_driven=self._event_driven,
+            scheduling_policy=self._scheduling_policy(),
+            concurrency_limiter=ConcurrencyLimiter(self._max_concurrent_tasks,
+                                                   self._concurrency_limits))
+        listener = _TransitionsListener() if self._event_driven else None
 
         try:
+            if listener:
+                listener.connect()
             events.start_workflow_signal.send(ctx)
             while True:
                 cancel = self._is_cancel(ctx)
@@ -59,13 +93,13 @@ class Engine(logger.LoggerMixin):
                 for task in tasks_tracker.ended_tasks:
                     self._handle_ended_tasks(task)
                     tasks_tracker.finished(task)
-                for task in tasks_tracker.executable_tasks:
-                    tasks_tracker.executing(task)
-                    self._handle_executable_task(ctx, task)
+                self._handle_executable_tasks(ctx, tasks_tracker)
                 if tasks_tracker.all_tasks_consumed:
                     break
+                elif listener:
+                    self._wait_for_transitions(listener, tasks_tracker)
                 else:
-                    time.sleep(0.1)
+                    time.sleep(self._poll_interval)
             if cancel:
                 self._terminate_tasks(tasks_tracker.executing_tasks)
                 events.on_cancelled_workflow_signal.send(ctx)
@@ -76,6 +110,26 @@ class Engine(logger.LoggerMixin):
             self._terminate_tasks(tasks_tracker.executing_tasks)
             events.on_failure_workflow_signal.send(ctx, exception=e)
             raise
+        finally:
+            if listener:
+                listener.disconnect()
+            # Make sure all the logs of the execution are written by the time it ends
+            ctx.flush_logs()
+
+    def _wait_for_transitions(self, listener, tasks_tracker):
+        """
+        Blocks until a task changed state, a cancel was requested, a retrying task became due or
+        the cancel check interval elapsed (the cancel request might come from another process).
+        """
+        timeout = self._cancel_check_interval
+        next_due_at = tasks_tracker.next_due_at
+        if next_due_at is not None:
+            delta = next_due_at - datetime.utcnow()
+            # timedelta.total_seconds does not exist in Python 2.6
+            due_in = delta.days * 86400 + delta.seconds + delta.microseconds / 1e6
+            timeout = max(min(timeout, due_in), 0)
+        for task_id in listener.wait(timeout):
+            tasks_tracker.changed(task_id)
 
     def _terminate_tasks(self, tasks):
         for task in tasks:
@@ -95,12 +149,27 @@ class Engine(logger.LoggerMixin):
 
     @staticmethod
     def _is_cancel(ctx):
-        execution = ctx.model.execution.refresh(ctx.execution)
-        return execution.status in (models.Execution.CANCELLING, models.Execution.CANCELLED)
+        # Checked on every iteration, so only the status is read (without blocking the writers)
+        status = ctx.model.execution.read_only.get(ctx.execution.id, include=('status',)).status
+        if status in (models.Execution.CANCELLING, models.Execution.CANCELLED):
+            ctx.model.execution.refresh(ctx.execution)
+            return True
+        return False
 
-    def _handle_executable_task(self, ctx, task):
-        task_executor = self._executors[task._executor]
+    def _handle_executable_tasks(self, ctx, tasks_tracker):
+        # All the tasks are marked as sent in a single transaction, and only then handed to their
+        # executors (which must not see uncommitted changes)
+        with ctx.model.batch():
+            prepared_tasks = []
+            for task in tasks_tracker.executable_tasks:
+                tasks_tracker.executing(task)
+                prepared_tasks.append((self._executors[task._executor],
+                                       self._prepare_executable_task(ctx, task)))
+        for task_executor, op_ctx in prepared_tasks:
+            task_executor.execute(op_ctx)
 
+    @staticmethod
+    def _prepare_executable_task(ctx, task):
         # If the task is a stub, a default context is provided, else it should hold the context cls
         context_cls = operation.BaseOperationContext if task._stub_type else task._context_cls
         op_ctx = context_cls(
@@ -116,7 +185,7 @@ class Engine(logger.LoggerMixin):
 
         if not task._stub_type:
             events.sent_task_signal.send(op_ctx)
-        task_executor.execute(op_ctx)
+        return op_ctx
 
     @staticmethod
     def _handle_ended_tasks(task):
@@ -124,55 +193,166 @@ class Engine(logger.LoggerMixin):
             raise exceptions.ExecutorException('Workflow failed')
 
 
+class _TransitionsListener(object):
+    """
+    Collects the IDs of tasks whose state was changed by the executors.
+    """
+
+    def __init__(self):
+        self._queue = Queue.Queue()
+
+    def connect(self):
+        events.task_state_changed_signal.connect(self._task_state_changed)
+        events.on_cancelling_workflow_signal.connect(self._cancelling)
+
+    def disconnect(self):
+        events.task_state_changed_signal.disconnect(self._task_state_changed)
+        events.on_cancelling_workflow_signal.disconnect(self._cancelling)
+
+    def wait(self, timeout):
+        """
+        Waits up to ``timeout`` seconds for the first transition, then drains all pending ones.
+
+        :return: list of changed task IDs (``None`` marks a cancel request)
+        """
+        try:
+            changed = [self._queue.get(timeout=timeout)]
+        except Queue.Empty:
+            return []
+        while True:
+            try:
+                changed.append(self._queue.get_nowait())
+            except Queue.Empty:
+                return changed
+
+    def _task_state_changed(self, ctx, task_id, **kwargs):
+        self._queue.put(task_id)
+
+    def _cancelling(self, workflow_context, **kwargs):
+        # Only wakes the engine, which checks the execution status on every iteration
+        self._queue.put(None)
+
+
 class _TasksTracker(object):
+    """
+    Tracks the state of the tasks of an execution.
+
+    Every task holds a counter of its dependencies that have not ended yet. When the counter drops
+    to zero the task is pushed onto a heap of ready tasks keyed on its ``due_at`` (retrying tasks
+    are pushed back onto it as well), so the cost of scheduling depends on the number of
+    transitions rather than on the size of the graph. Once due, tasks move to a heap keyed on the
+    priority given by the scheduling policy, where they stay while the concurrency limiter does not
+    admit them.
+    """
 
-    def __init__(self, ctx):
+    def __init__(self, ctx, event_driven=False, scheduling_policy=None, concurrency_limiter=None):
         self._ctx = ctx
+        self._event_driven = event_driven
+        self._scheduling_policy = scheduling_policy or FifoPolicy()
+        self._concurrency_limiter = concurrency_limiter or ConcurrencyLimiter()
 
         self._tasks = ctx.execution.tasks
-        self._executed_tasks = [task for task in self._tasks if task.has_ended()]
-        self._executable_tasks = list(set(self._tasks) - set(self._executed_tasks))
-        self._executing_tasks = []
+        self._tasks_by_id = dict((task.id, task) for task in self._tasks)
+        self._changed_tasks = set()
+        self._executed_tasks = set(task.id for task in self._tasks if task.has_ended())
+        self._executing_tasks = OrderedDict()
+
+        self._scheduling_policy.prepare(self._tasks)
+
+        # Heaps of (due_at, sequence, task) and of (priority, sequence, task); the sequence keeps
+        # the heaps stable and prevents comparing tasks
+        self._ready_tasks = []
+        self._due_tasks = []
+        self._ready_task_ids = set()
+        self._sequence = itertools.count()
+
+        self._pending_dependencies_count = {}
+        self._dependents = {}
+        for task in self._tasks:
+            if task.id in self._executed_tasks:
+                continue
+            pending_dependencies = [dependency for dependency in task.dependencies
+                                    if dependency.id not in self._executed_tasks]
+            self._pending_dependencies_count[task.id] = len(pending_dependencies)
+            for dependency in pending_dependencies:
+                self._dependents.setdefault(dependency.id, []).append(task)
+            if not pending_dependencies:
+                self._ready(task)
 
     @property
     def all_tasks_consumed(self):
-        return len(self._executed_tasks) == len(self._tasks) and len(self._executing_tasks) == 0
+        return len(self._executed_tasks) == len(self._tasks) and not self._executing_tasks
 
     def executing(self, task):
-        # Task executing could be retrying (thus removed and added earlier)
-        if task not in self._executing_tasks:
-            self._executable_tasks.remove(task)
-            self._executing_tasks.append(task)
+        # Task executing could be retrying (thus already executing)
+        self._executing_tasks[task.id] = task
 
     def finished(self, task):
-        self._executing_tasks.remove(task)
-        self._executed_tasks.append(task)
+        del self._executing_tasks[task.id]
+        self._concurrency_limiter.release(task)
+        self._executed_tasks.add(task.id)
+        for dependent in self._dependents.pop(task.id, ()):
+            self._pending_dependencies_count[dependent.id] -= 1
+            if self._pending_dependencies_count[dependent.id] == 0:
+                self._ready(dependent)
+
+    def changed(self, task_id):
+        """
+        Marks a task as changed, so it would be re-read from the storage (when event driven).
+        """
+        task = self._tasks_by_id.get(task_id)
+        if task is not None:
+            self._changed_tasks.add(task)
+
+    @property
+    def next_due_at(self):
+        """
+        Earliest due time of a ready task that is not due yet, or ``None``.
+
+        (Due tasks that were not admitted wait for running tasks to end.)
+        """
+        return self._ready_tasks[0][0] if self._ready_tasks else None
 
     @property
     def ended_tasks(self):
         for task in self.executing_tasks:
             if task.has_ended():
                 yield task
+            # A failed task that is about to be retried goes back to the ready tasks
+            elif task.status == task.RETRYING and task.id not in self._ready_task_ids:
+                self._concurrency_limiter.release(task)
+                self._ready(task)
 
     @property
     def executable_tasks(self):
         now = datetime.utcnow()
-        # we need both lists since retrying task are in the executing task list.
-        for task in self._update_tasks(set(self._executing_tasks + self._executable_tasks)):
-            if all([task.is_waiting(),
-                    task.due_at <= now,
-                    all(dependency in self._executed_tasks for dependency in task.dependencies)
-                   ]):
-                yield task
+        while self._ready_tasks and self._ready_tasks[0][0] <= now:
+            _, sequence, task = heapq.heappop(self._ready_tasks)
+            heapq.heappush(self._due_tasks,
+                           (self._scheduling_policy.priority(task), sequence, task))
+        not_admitted = []
+        try:
+            while self._due_tasks:
+                entry = heapq.heappop(self._due_tasks)
+                task = entry[2]
+                if self._concurrency_limiter.admit(task):
+                    self._ready_task_ids.discard(task.id)
+                    yield task
+                else:
+                    not_admitted.append(entry)
+        finally:
+            for entry in not_admitted:
+                heapq.heappush(self._due_tasks, entry)
 
     @property
     def executing_tasks(self):
-        for task in self._update_tasks(self._executing_tasks):
+        for task in self._update_tasks(self._executing_tasks.values()):
             yield task
 
     @property
     def executed_tasks(self):
-        for task in self._update_tasks(self._executed_tasks):
+        for task in self._update_tasks(self._tasks_by_id[task_id]
+                                       for task_id in self._executed_tasks):
             yield task
 
     @property
@@ -180,6 +360,14 @@ class _TasksTracker(object):
         for task in self._update_tasks(self._tasks):
             yield task
 
+    def _ready(self, task):
+        self._ready_task_ids.add(task.id)
+        heapq.heappush(self._ready_tasks, (task.due_at, next(self._sequence), task))
+
     def _update_tasks(self, tasks):
         for task in tasks:
-            yield self._ctx.model.task.refresh(task)
+            if self._event_driven and task not in self._changed_tasks:
+                yield task
+            else:
+                self._changed_tasks.discard(task)
+                yield self._ctx.model.task.refresh(task)
@@ -17,6 +17,7 @@
 Workflow event handling.
 """
 
+from contextlib import contextmanager
 from datetime import (
     datetime,
     timedelta,
@@ -34,46 +35,49 @@ def _task_sent(ctx, *args, **kwargs):
 
 @events.start_task_signal.connect
 def _task_started(ctx, *args, **kwargs):
-    with ctx.persist_changes:
-        ctx.task.started_at = datetime.utcnow()
-        ctx.task.status = ctx.task.STARTED
-        _update_node_state_if_necessary(ctx, is_transitional=True)
+    with _batch(ctx):
+        with ctx.persist_changes:
+            ctx.task.started_at = datetime.utcnow()
+            ctx.task.status = ctx.task.STARTED
+            _update_node_state_if_necessary(ctx, is_transitional=True)
 
 
 @events.on_failure_task_signal.connect
 def _task_failed(ctx, exception, *args, **kwargs):
-    with ctx.persist_changes:
-        should_retry = all([
-            not isinstance(exception, exceptions.TaskAbortException),
-            ctx.task.attempts_count < ctx.task.max_attempts or
-            ctx.task.max_attempts == ctx.task.INFINITE_RETRIES,
-            # ignore_failure check here means the task will not be retried and it will be marked
-            # as failed. The engine will also look at ignore_failure so it won't fail the
-            # workflow.
-            not ctx.task.ignore_failure
-        ])
-        if should_retry:
-            retry_interval = None
-            if isinstance(exception, exceptions.TaskRetryException):
-                retry_interval = exception.retry_interval
-            if retry_interval is None:
-                retry_interval = ctx.task.retry_interval
-            ctx.task.status = ctx.task.RETRYING
-            ctx.task.attempts_count += 1
-            ctx.task.due_at = datetime.utcnow() + timedelta(seconds=retry_interval)
-        else:
-            ctx.task.ended_at = datetime.utcnow()
-            ctx.task.status = ctx.task.FAILED
+    with _batch(ctx):
+        with ctx.persist_changes:
+            should_retry = all([
+                not isinstance(exception, exceptions.TaskAbortException),
+                ctx.task.attempts_count < ctx.task.max_attempts or
+                ctx.task.max_attempts == ctx.task.INFINITE_RETRIES,
+                # ignore_failure check here means the task will not be retried and it will be marked
+                # as failed. The engine will also look at ignore_failure so it won't fail the
+                # workflow.
+                not ctx.task.ignore_failure
+            ])
+            if should_retry:
+                retry_interval = None
+                if isinstance(exception, exceptions.TaskRetryException):
+                    retry_interval = exception.retry_interval
+                if retry_interval is None:
+                    retry_interval = ctx.task.retry_interval
+                ctx.task.status = ctx.task.RETRYING
+                ctx.task.attempts_count += 1
+                ctx.task.due_at = datetime.utcnow() + timedelta(seconds=retry_interval)
+            else:
+                ctx.task.ended_at = datetime.utcnow()
+                ctx.task.status = ctx.task.FAILED
 
 
 @events.on_success_task_signal.connect
 def _task_succeeded(ctx, *args, **kwargs):
-    with ctx.persist_changes:
-        ctx.task.ended_at = datetime.utcnow()
-        ctx.task.status = ctx.task.SUCCESS
-        ctx.task.attempts_count += 1
+    with _batch(ctx):
+        with ctx.persist_changes:
+            ctx.task.ended_at = datetime.utcnow()
+            ctx.task.status = ctx.task.SUCCESS
+            ctx.task.attempts_count += 1
 
-        _update_node_state_if_necessary(ctx)
+            _update_node_state_if_necessary(ctx)
 
 
 @events.start_workflow_signal.connect
@@ -150,6 +154,17 @@ def _workflow_cancelling(workflow_context, *args, **kwargs):
             execution.status = execution.CANCELLING
 
 
+@contextmanager
+def _batch(ctx):
+    # The task and the node state derived from it are written in a single transaction (if the
+    # context has a model storage at all)
+    if ctx.model is None:
+        yield
+    else:
+        with ctx.model.batch():
+            yield
+
+
 def _update_node_state_if_necessary(ctx, is_transitional=False):
     # TODO: this is not the right way to check! the interface name is arbitrary
     # and also will *never* be the type name
@@ -15,15 +15,26 @@
 
 
 from ....modeling import models
+from ....utils.collections import OrderedDict
 from .. import executor, api
 
 
 class GraphCompiler(object):
-    def __init__(self, ctx, default_executor):
+    def __init__(self, ctx, default_executor, bulk=True):
+        """
+        :param ctx: workflow context
+        :param default_executor: executor class for operation tasks
+        :param bulk: whether to build the whole execution graph in memory and store it in a single
+         transaction, rather than storing each task as it is created
+        """
         self._ctx = ctx
         self._default_executor = default_executor
         self._stub_executor = executor.base.StubTaskExecutor
+        self._bulk = bulk
         self._model_to_api_id = {}
+        self._api_id_to_model = {}
+        self._non_dependent_tasks = None
+        self._new_tasks = []
 
     def compile(self,
                 task_graph,
@@ -37,6 +48,22 @@ class GraphCompiler(object):
         :param end_stub_type: internal use
         :param depends_on: internal use
         """
+        if self._non_dependent_tasks is None:
+            # Tasks that no other task depends on, kept up to date as tasks are created
+            self._non_dependent_tasks = OrderedDict(
+                (task, None) for task in self._get_non_dependent_tasks(self._ctx.execution))
+
+        self._compile(task_graph, start_stub_type, end_stub_type, depends_on)
+
+        if self._bulk and self._new_tasks:
+            with self._ctx.model.batch():
+                for model_task, _ in self._new_tasks:
+                    self._ctx.model.task.put(model_task)
+            for model_task, api_id in self._new_tasks:
+                self._model_to_api_id[model_task.id] = api_id
+            del self._new_tasks[:]
+
+    def _compile(self, task_graph, start_stub_type, end_stub_type, depends_on):
         depends_on = list(depends_on)
 
         # Insert start marker
@@ -54,7 +81,7 @@ class GraphCompiler(object):
 
             elif isinstance(task, api.task.WorkflowTask):
                 # Build the graph recursively while adding start and end markers
-                self.compile(
+                self._compile(
                     task, models.Task.START_SUBWROFKLOW, models.Task.END_SUBWORKFLOW, dependencies
                 )
             elif isinstance(task, api.task.StubTask):
@@ -65,7 +92,7 @@ class GraphCompiler(object):
         # Insert end marker
         self._create_stub_task(
             end_stub_type,
-            self._get_non_dependent_tasks(self._ctx.execution) or [start_task],
+            list(self._non_dependent_tasks) or [start_task],
             self._end_graph_suffix(task_graph.id),
             task_graph.name
         )
@@ -77,17 +104,26 @@ class GraphCompiler(object):
             execution=self._ctx.execution,
             _executor=self._stub_executor,
             _stub_type=stub_type)
-        self._ctx.model.task.put(model_task)
-        self._model_to_api_id[model_task.id] = api_id
+        self._add_task(model_task, api_id)
         return model_task
 
     def _create_operation_task(self, api_task, dependencies):
         model_task = models.Task.from_api_task(
             api_task, self._default_executor, dependencies=dependencies)
-        self._ctx.model.task.put(model_task)
-        self._model_to_api_id[model_task.id] = api_task.id
+        self._add_task(model_task, api_task.id)
         return model_task
 
+    def _add_task(self, model_task, api_id):
+        self._api_id_to_model[api_id] = model_task
+        for dependency in model_task.dependencies:
+            self._non_dependent_tasks.pop(dependency, None)
+        self._non_dependent_tasks[model_task] = None
+        if self._bulk:
+            self._new_tasks.append((model_task, api_id))
+        else:
+            self._ctx.model.task.put(model_task)
+            self._model_to_api_id[model_task.id] = api_id
+
     @staticmethod
     def _start_graph_suffix(api_id):
         return '{0}-Start'.format(api_id)
@@ -113,6 +149,7 @@ class GraphCompiler(object):
                 dependency_name = dependency.id
             else:
                 dependency_name = self._end_graph_suffix(dependency.id)
-            tasks.extend(task for task in self._ctx.execution.tasks
-                         if self._model_to_api_id.get(task.id, None) == dependency_name)
+            task = self._api_id_to_model.get(dependency_name)
+            if task is not None:
+                tasks.append(task)
         return tasks
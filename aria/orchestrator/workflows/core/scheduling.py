@@ -0,0 +1,170 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Scheduling policies, which decide the order in which ready tasks are dispatched.
+"""
+
+
+class SchedulingPolicy(object):
+    """
+    Base class for scheduling policies.
+
+    Ready tasks are dispatched in ascending order of their priority keys, and in the order in
+    which they became ready when the keys are equal.
+    """
+
+    def prepare(self, tasks):
+        """
+        Called once when the execution starts, with all of its tasks.
+        """
+        pass
+
+    def priority(self, task):
+        """
+        Returns the priority key of a ready task (lower keys are dispatched first).
+        """
+        raise NotImplementedError
+
+
+class FifoPolicy(SchedulingPolicy):
+    """
+    Dispatches ready tasks in the order in which they became ready.
+    """
+
+    def priority(self, task):
+        return 0
+
+
+class CriticalPathPolicy(SchedulingPolicy):
+    """
+    Dispatches first the ready tasks with the longest remaining path, that is the largest number of
+    operations that must run, one after the other, from the task until the end of the execution.
+    Those are the tasks on the critical path: delaying them delays the whole execution.
+
+    Stub tasks do not count towards the length of a path.
+    """
+
+    def __init__(self):
+        self._weights = {}
+
+    def prepare(self, tasks):
+        tasks = list(tasks)
+        dependents_count = dict((task.id, 0) for task in tasks)
+        for task in tasks:
+            for dependency in task.dependencies:
+                if dependency.id in dependents_count:
+                    dependents_count[dependency.id] += 1
+
+        # Tasks are weighed after all of their dependents, starting from the end of the execution
+        weights = {}
+        remaining = [task for task in tasks if dependents_count[task.id] == 0]
+        while remaining:
+            task = remaining.pop()
+            weight = weights.get(task.id, 0) + (0 if task._stub_type else 1)
+            weights[task.id] = weight
+            for dependency in task.dependencies:
+                if dependency.id not in dependents_count:
+                    continue
+                weights[dependency.id] = max(weights.get(dependency.id, 0), weight)
+                dependents_count[dependency.id] -= 1
+                if dependents_count[dependency.id] == 0:
+                    remaining.append(dependency)
+        self._weights = weights
+
+    def priority(self, task):
+        return -self._weights.get(task.id, 0)
+
+
+def _get_host_key(task):
+    node = task.node if task.node is not None else task.relationship.source_node
+    host = node.host if node.host is not None else node
+    return host.id
+
+
+def _get_plugin_key(task):
+    return task.plugin.id if task.plugin is not None else None
+
+
+def _get_operation_key(task):
+    return task.interface_name, task.operation_name
+
+
+class ConcurrencyLimiter(object):
+    """
+    Admission control for dispatching tasks: tasks above the limits are kept waiting (in priority
+    order) until running tasks end.
+
+    Stub tasks are neither limited nor counted.
+
+    :param max_tasks: maximum number of tasks running at once (``None`` for no limit)
+    :param limits: dict of key (``host``, ``plugin`` or ``operation``) to the maximum number of
+     tasks running at once for each value of that key, for example ``{'host': 4}`` would run at most
+     4 tasks at once on each host node
+    """
+
+    KEYS = {
+        'host': _get_host_key,
+        'plugin': _get_plugin_key,
+        'operation': _get_operation_key
+    }
+
+    def __init__(self, max_tasks=None, limits=None):
+        if (max_tasks is not None) and (max_tasks < 1):
+            raise ValueError('maximum number of tasks must be at least 1: {0}'.format(max_tasks))
+        self.max_tasks = max_tasks
+        self.limits = dict(limits or {})
+        for key, limit in self.limits.iteritems():
+            if key not in self.KEYS:
+                raise ValueError('unsupported concurrency limit key: {0}'.format(key))
+            if limit < 1:
+                raise ValueError('concurrency limit of {0} must be at least 1: {1}'
+                                 .format(key, limit))
+        self._running_tasks = {}
+        self._running_counts = {}
+
+    @property
+    def full(self):
+        """
+        Whether no more (non-stub) tasks can be admitted.
+        """
+        return (self.max_tasks is not None) and (len(self._running_tasks) >= self.max_tasks)
+
+    def admit(self, task):
+        """
+        Admits the task if it's within the limits.
+
+        :return: ``True`` if admitted, in which case it must be released when it stops running
+        """
+        if task._stub_type or (task.id in self._running_tasks):
+            return True
+        if self.full:
+            return False
+        keys = [(key, get_key(task)) for key, get_key in self.KEYS.iteritems()
+                if key in self.limits]
+        for key in keys:
+            if self._running_counts.get(key, 0) >= self.limits[key[0]]:
+                return False
+        for key in keys:
+            self._running_counts[key] = self._running_counts.get(key, 0) + 1
+        self._running_tasks[task.id] = keys
+        return True
+
+    def release(self, task):
+        """
+        Releases an admitted task.
+        """
+        for key in self._running_tasks.pop(task.id, ()):
+            self._running_counts[key] -= 1
@@ -59,17 +59,27 @@ class BaseExecutor(logger.LoggerMixin):
     @staticmethod
     def _task_started(ctx):
         events.start_task_signal.send(ctx)
+        BaseExecutor._task_state_changed(ctx)
 
     @staticmethod
     def _task_failed(ctx, exception, traceback=None):
         events.on_failure_task_signal.send(ctx, exception=exception, traceback=traceback)
+        BaseExecutor._task_state_changed(ctx)
 
     @staticmethod
     def _task_succeeded(ctx):
         events.on_success_task_signal.send(ctx)
+        BaseExecutor._task_state_changed(ctx)
+
+    @staticmethod
+    def _task_state_changed(ctx):
+        # Receivers of the signals above persist the transition, so by now listeners (such as the
+        # engine) may safely re-read the task
+        events.task_state_changed_signal.send(ctx, task_id=ctx.task.id)
 
 
 class StubTaskExecutor(BaseExecutor):                                                               # pylint: disable=abstract-method
     def execute(self, ctx, *args, **kwargs):
         with ctx.persist_changes:
             ctx.task.status = ctx.task.SUCCESS
+        self._task_state_changed(ctx)
@@ -26,27 +26,32 @@ import sys
 # entry point. We thus remove this module's directory from the python path if it happens to be
 # there
 
-from collections import namedtuple
+from collections import namedtuple, deque
 
 script_dir = os.path.dirname(__file__)
 if script_dir in sys.path:
     sys.path.remove(script_dir)
 
+import binascii
 import contextlib
 import io
+import itertools
+import logging
 import threading
+import select
 import socket
 import struct
 import subprocess
-import tempfile
 import Queue
 import pickle
 
 import psutil
-import jsonpickle
 
 import aria
+from aria.logger import TASK_LOGGER_NAME
 from aria.orchestrator.workflows.executor import base
+from aria.orchestrator.workflows.exceptions import ExecutorException
+from aria import extension
 from aria.extension import process_executor
 from aria.utils import (
     imports,
@@ -57,6 +62,9 @@ from aria.utils import (
 
 _INT_FMT = 'I'
 _INT_SIZE = struct.calcsize(_INT_FMT)
+_PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+_TOKEN_ENV_VAR = 'ARIA_WORKER_TOKEN'
+_HELLO_TIMEOUT = 10
 UPDATE_TRACKED_CHANGES_FAILED_STR = \
     'Some changes failed writing to storage. For more info refer to the log.'
 
@@ -67,9 +75,28 @@ _Task = namedtuple('_Task', 'proc, ctx')
 class ProcessExecutor(base.BaseExecutor):
     """
     Sub-process task executor.
+
+    Every subprocess holds a single connection to the executor for its whole lifetime. Task
+    payloads are sent to it, and status messages are received from it, over that connection as
+    length-prefixed pickled frames. A connection must first present the secret token of its worker
+    (passed in the worker environment), and nothing it sends is unpickled before that.
+
+    By default every task runs in a new Python interpreter. When ``worker_pool_size`` is set, tasks
+    run in long-lived worker processes instead, saving the interpreter startup and the import of
+    ARIA and its extensions for every task. Workers are never shared between plugins (each plugin
+    has its own environment), and are replaced after ``max_tasks_per_worker`` tasks or when they
+    exit unexpectedly.
+
+    :param plugin_manager: plugin manager used to load plugins into the subprocess environment
+    :param python_path: additional directories to add to the subprocess Python path
+    :param worker_pool_size: maximum number of worker processes per plugin; tasks beyond that wait
+     for a worker to become available (``0`` starts a new process per task)
+    :param max_tasks_per_worker: number of tasks after which a worker is replaced (``None`` for
+     no limit)
     """
 
-    def __init__(self, plugin_manager=None, python_path=None, *args, **kwargs):
+    def __init__(self, plugin_manager=None, python_path=None, worker_pool_size=0,
+                 max_tasks_per_worker=None, *args, **kwargs):
         super(ProcessExecutor, self).__init__(*args, **kwargs)
         self._plugin_manager = plugin_manager
 
@@ -77,27 +104,38 @@ class ProcessExecutor(base.BaseExecutor):
         # subprocesses python path
         self._python_path = python_path or []
 
+        self._worker_pool_size = worker_pool_size
+        self._max_tasks_per_worker = max_tasks_per_worker
+
         # Flag that denotes whether this executor has been stopped
         self._stopped = False
 
         # Contains reference to all currently running tasks
         self._tasks = {}
 
+        # Pooled worker processes and tasks waiting for a worker, both keyed by plugin ID
+        self._workers = {}
+        self._queued_tasks = {}
+
+        # All worker processes (pooled or not) by worker ID, and by their connection once they
+        # connected
+        self._workers_by_id = {}
+        self._workers_by_connection = {}
+        self._worker_ids = itertools.count(1)
+        self._workers_lock = threading.RLock()
+
         self._request_handlers = {
             'started': self._handle_task_started_request,
             'succeeded': self._handle_task_succeeded_request,
             'failed': self._handle_task_failed_request,
         }
 
-        # Server socket used to accept task status messages from subprocesses
+        # Server socket accepting the connections of the subprocesses
         self._server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._server_socket.bind(('localhost', 0))
         self._server_socket.listen(10)
         self._server_port = self._server_socket.getsockname()[1]
 
-        # Used to send a "closed" message to the listener when this executor is closed
-        self._messenger = _Messenger(task_id=None, port=self._server_port)
-
         # Queue object used by the listener thread to notify this constructed it has started
         # (see last line of this __init__ method)
         self._listener_started = Queue.Queue()
@@ -110,20 +148,32 @@ class ProcessExecutor(base.BaseExecutor):
         # Wait for listener thread to actually start before returning
         self._listener_started.get(timeout=60)
 
+        # Pre-fork the workers for non-plugin operations
+        if self._worker_pool_size:
+            with self._workers_lock:
+                for _ in range(self._worker_pool_size):
+                    self._spawn_worker(plugin=None)
+
     def close(self):
         if self._stopped:
             return
         self._stopped = True
-        # Listener thread may be blocked on "accept" call. This will wake it up with an explicit
-        # "closed" message
-        self._messenger.closed()
-        self._server_socket.close()
+        # Listener thread may be blocked on "select" call. Connecting wakes it up, and it then
+        # exits since the executor is stopped
+        socket.create_connection(('localhost', self._server_port)).close()
         self._listener_thread.join(timeout=60)
+        self._server_socket.close()
 
         # we use set(self._tasks) since tasks may change in the process of closing
         for task_id in set(self._tasks):
             self.terminate(task_id)
 
+        with self._workers_lock:
+            for worker in self._workers_by_id.values():
+                worker.close()
+            self._workers.clear()
+            self._queued_tasks.clear()
+
     def terminate(self, task_id):
         task = self._remove_task(task_id)
         # The process might have managed to finish, thus it would not be in the tasks list
@@ -142,23 +192,104 @@ class ProcessExecutor(base.BaseExecutor):
     def _execute(self, ctx):
         self._check_closed()
 
-        # Temporary file used to pass arguments to the started subprocess
-        file_descriptor, arguments_json_path = tempfile.mkstemp(prefix='executor-', suffix='.json')
-        os.close(file_descriptor)
-        with open(arguments_json_path, 'wb') as f:
-            f.write(pickle.dumps(self._create_arguments_dict(ctx)))
-
-        env = self._construct_subprocess_env(task=ctx.task)
-        # Asynchronously start the operation in a subprocess
+        with self._workers_lock:
+            if self._worker_pool_size:
+                self._execute_in_pooled_worker(ctx)
+            else:
+                # A dedicated worker, which is closed once the task ends
+                self._assign_task(self._spawn_worker(ctx.task.plugin, pooled=False), ctx)
+
+    def _execute_in_pooled_worker(self, ctx):
+        plugin = ctx.task.plugin
+        plugin_id = plugin.id if plugin else None
+        workers = self._workers.setdefault(plugin_id, [])
+        worker = next((w for w in workers if w.task_id is None), None)
+        if worker is None and len(workers) < self._worker_pool_size:
+            worker = self._spawn_worker(plugin)
+        if worker is None:
+            self._queued_tasks.setdefault(plugin_id, deque()).append(ctx)
+        else:
+            self._assign_task(worker, ctx)
+
+    def _spawn_worker(self, plugin, pooled=True):
+        worker_id = str(next(self._worker_ids))
+        token = binascii.hexlify(os.urandom(16))
+        env = self._construct_subprocess_env(plugin=plugin)
+        # Passed in the environment rather than the command line, which other users can see
+        env[_TOKEN_ENV_VAR] = token
         proc = subprocess.Popen(
             [
                 sys.executable,
                 os.path.expanduser(os.path.expandvars(__file__)),
-                os.path.expanduser(os.path.expandvars(arguments_json_path))
+                str(self._server_port),
+                worker_id
             ],
             env=env)
 
-        self._tasks[ctx.task.id] = _Task(ctx=ctx, proc=proc)
+        worker = _Worker(worker_id=worker_id, token=token,
+                         plugin_id=plugin.id if plugin else None, proc=proc, pooled=pooled)
+        self._workers_by_id[worker_id] = worker
+        if pooled:
+            self._workers.setdefault(worker.plugin_id, []).append(worker)
+
+        # Watches for workers that exit unexpectedly
+        monitor_thread = threading.Thread(target=self._monitor_worker, args=(worker,))
+        monitor_thread.daemon = True
+        monitor_thread.start()
+        return worker
+
+    def _assign_task(self, worker, ctx):
+        worker.task_id = ctx.task.id
+        self._tasks[ctx.task.id] = _Task(ctx=ctx, proc=worker.proc)
+        worker.send(self._create_arguments_dict(ctx))
+
+    def _release_worker(self, task_id):
+        with self._workers_lock:
+            worker = self._find_worker(task_id)
+            if worker is None:
+                return
+            worker.task_id = None
+            worker.tasks_count += 1
+            plugin_id = worker.plugin_id
+            if not worker.pooled or (self._max_tasks_per_worker and
+                                     worker.tasks_count >= self._max_tasks_per_worker):
+                self._discard_worker(worker)
+                worker.close()
+                worker = None
+            self._dispatch_queued_task(plugin_id, worker)
+
+    def _dispatch_queued_task(self, plugin_id, worker=None):
+        queued_tasks = self._queued_tasks.get(plugin_id)
+        if self._stopped or not queued_tasks:
+            return
+        ctx = queued_tasks.popleft()
+        self._assign_task(worker or self._spawn_worker(ctx.task.plugin), ctx)
+
+    def _monitor_worker(self, worker):
+        return_code = worker.proc.wait()
+        with self._workers_lock:
+            self._discard_worker(worker)
+            self._workers_by_id.pop(worker.worker_id, None)
+            task = self._remove_task(worker.task_id) if worker.task_id else None
+            if task:
+                self._task_failed(
+                    task.ctx,
+                    exception=ExecutorException(
+                        'Worker process exited unexpectedly with return code {0}'
+                        .format(return_code)))
+            # The queued tasks of this plugin may have no worker left to pick them up
+            if worker.pooled and not self._workers.get(worker.plugin_id):
+                self._dispatch_queued_task(worker.plugin_id)
+
+    def _discard_worker(self, worker):
+        workers = self._workers.get(worker.plugin_id, [])
+        if worker in workers:
+            workers.remove(worker)
+
+    def _find_worker(self, task_id):
+        for worker in self._workers_by_id.values():
+            if worker.task_id == task_id:
+                return worker
 
     def _remove_task(self, task_id):
         return self._tasks.pop(task_id, None)
@@ -167,22 +298,22 @@ class ProcessExecutor(base.BaseExecutor):
         if self._stopped:
             raise RuntimeError('Executor closed')
 
-    def _create_arguments_dict(self, ctx):
+    @staticmethod
+    def _create_arguments_dict(ctx):
         return {
             'task_id': ctx.task.id,
             'function': ctx.task.function,
             'operation_arguments': dict(arg.unwrapped for arg in ctx.task.arguments.itervalues()),
-            'port': self._server_port,
             'context': ctx.serialization_dict
         }
 
-    def _construct_subprocess_env(self, task):
+    def _construct_subprocess_env(self, plugin):
         env = os.environ.copy()
 
-        if task.plugin_fk and self._plugin_manager:
+        if plugin and self._plugin_manager:
             # If this is a plugin operation,
             # load the plugin on the subprocess env we're constructing
-            self._plugin_manager.load_plugin(task.plugin, env=env)
+            self._plugin_manager.load_plugin(plugin, env=env)
 
         # Add user supplied directories to injected PYTHONPATH
         if self._python_path:
@@ -195,67 +326,151 @@ class ProcessExecutor(base.BaseExecutor):
         self._listener_started.put(True)
         while not self._stopped:
             try:
-                with self._accept_request() as (request, response):
-                    request_type = request['type']
-                    if request_type == 'closed':
-                        break
-                    request_handler = self._request_handlers.get(request_type)
-                    if not request_handler:
-                        raise RuntimeError('Invalid request type: {0}'.format(request_type))
-                    task_id = request['task_id']
-                    request_handler(task_id=task_id, request=request, response=response)
+                connections = [self._server_socket] + self._workers_by_connection.keys()
+                readable, _, _ = select.select(connections, [], [])
+                for connection in readable:
+                    if self._stopped:
+                        return
+                    if connection is self._server_socket:
+                        self._handle_hello(self._server_socket.accept()[0])
+                    else:
+                        self._handle_messages(connection)
             except BaseException as e:
                 self.logger.debug('Error in process executor listener: {0}'.format(e))
 
-    @contextlib.contextmanager
-    def _accept_request(self):
-        with contextlib.closing(self._server_socket.accept()[0]) as connection:
-            message = _recv_message(connection)
-            response = {}
+    def _handle_hello(self, connection):
+        """
+        Handles the first frame of a new connection, which holds the ID and token of a worker.
+
+        The frame is not a pickle, so that connections not made by our workers cannot have
+        anything unpickled. Such connections are closed.
+        """
+        # A connection that does not send its hello right away must not block the listener
+        connection.settimeout(_HELLO_TIMEOUT)
+        try:
+            worker_id, _, token = _recv_frame(connection).partition(' ')
+        except (struct.error, socket.error):
+            connection.close()
+            return
+        connection.settimeout(None)
+        with self._workers_lock:
+            worker = self._workers_by_id.get(worker_id)
+            if worker is None or worker.connected or token != worker.token:
+                connection.close()
+                return
+            self._workers_by_connection[connection] = worker
+            worker.connect(connection)
+
+    def _handle_messages(self, connection):
+        """
+        Handles a single frame, which may hold several messages.
+        """
+        try:
+            messages = _recv_message(connection)
+        except struct.error:
+            # The subprocess went away
+            self._workers_by_connection.pop(connection, None)
+            connection.close()
+            return
+        for message in messages:
+            message_type = message['type']
+            request_handler = self._request_handlers.get(message_type)
+            if not request_handler:
+                raise RuntimeError('Invalid request type: {0}'.format(message_type))
             try:
-                yield message, response
+                request_handler(connection=connection, request=message,
+                                task_id=message.get('task_id'))
             except BaseException as e:
-                response['exception'] = exceptions.wrap_if_needed(e)
-                raise
-            finally:
-                _send_message(connection, response)
+                self.logger.debug('Error in process executor listener: {0}'.format(e))
 
-    def _handle_task_started_request(self, task_id, **kwargs):
-        self._task_started(self._tasks[task_id].ctx)
+    def _handle_task_started_request(self, connection, task_id, **kwargs):
+        # The subprocess waits for this response before running the operation
+        response = {}
+        try:
+            self._task_started(self._tasks[task_id].ctx)
+        except BaseException as e:
+            response['exception'] = _wrap_exception(e)
+            raise
+        finally:
+            _send_message(connection, response)
 
     def _handle_task_succeeded_request(self, task_id, **kwargs):
         task = self._remove_task(task_id)
         if task:
             self._task_succeeded(task.ctx)
+        self._release_worker(task_id)
 
     def _handle_task_failed_request(self, task_id, request, **kwargs):
         task = self._remove_task(task_id)
         if task:
-            self._task_failed(
-                task.ctx, exception=request['exception'], traceback=request['traceback'])
+            self._task_failed(task.ctx,
+                              exception=_load_exception(request['exception']),
+                              traceback=request['traceback'])
+        self._release_worker(task_id)
+
+
+class _Worker(object):
+    """
+    Subprocess running one task at a time, connected to the executor through a single connection.
+
+    Messages sent before the subprocess connects are kept until it does.
+    """
+
+    def __init__(self, worker_id, token, plugin_id, proc, pooled):
+        self.worker_id = worker_id
+        self.token = token
+        self.plugin_id = plugin_id
+        self.proc = proc
+        self.pooled = pooled
+        self.task_id = None
+        self.tasks_count = 0
+        self._connection = None
+        self._pending_messages = []
+
+    @property
+    def connected(self):
+        return self._connection is not None
+
+    def connect(self, connection):
+        self._connection = connection
+        for message in self._pending_messages:
+            _send_message(connection, message)
+        self._pending_messages = []
+
+    def send(self, message):
+        if self._connection is None:
+            self._pending_messages.append(message)
+        else:
+            _send_message(self._connection, message)
+
+    def close(self):
+        """
+        Asks the worker to exit once it is done with its current task.
+        """
+        try:
+            self.send(None)
+        except BaseException:
+            pass
 
 
 def _send_message(connection, message):
+    _send_frame(connection, pickle.dumps(message, _PICKLE_PROTOCOL))
 
+
+def _recv_message(connection):
+    return pickle.loads(_recv_frame(connection))
+
+
+def _send_frame(connection, data):
     # Packing the length of the entire msg using struct.pack.
     # This enables later reading of the content.
-    def _pack(data):
-        return struct.pack(_INT_FMT, len(data))
+    connection.sendall(struct.pack(_INT_FMT, len(data)) + data)
 
-    data = jsonpickle.dumps(message)
-    msg_metadata = _pack(data)
-    connection.send(msg_metadata)
-    connection.sendall(data)
 
-
-def _recv_message(connection):
+def _recv_frame(connection):
     # Retrieving the length of the msg to come.
-    def _unpack(conn):
-        return struct.unpack(_INT_FMT, _recv_bytes(conn, _INT_SIZE))[0]
-
-    msg_metadata_len = _unpack(connection)
-    msg = _recv_bytes(connection, msg_metadata_len)
-    return jsonpickle.loads(msg)
+    length = struct.unpack(_INT_FMT, _recv_bytes(connection, _INT_SIZE))[0]
+    return _recv_bytes(connection, length)
 
 
 def _recv_bytes(connection, count):
@@ -270,15 +485,42 @@ def _recv_bytes(connection, count):
         count -= len(read)
 
 
+def _wrap_exception(exception):
+    return exceptions.wrap_if_needed(exception,
+                                     dumps=lambda e: pickle.dumps(e, _PICKLE_PROTOCOL),
+                                     loads=pickle.loads)
+
+
+def _dump_exception(exception):
+    # The exception is pickled on its own, since its class might only be importable in the
+    # subprocess (e.g. when defined by a plugin)
+    return {
+        'type': type(exception).__name__,
+        'message': str(exception),
+        'data': pickle.dumps(_wrap_exception(exception), _PICKLE_PROTOCOL)
+    }
+
+
+def _load_exception(dumped_exception):
+    try:
+        return pickle.loads(dumped_exception['data'])
+    except BaseException:
+        return ExecutorException('{0}: {1}'.format(dumped_exception['type'],
+                                                   dumped_exception['message']))
+
+
 class _Messenger(object):
 
-    def __init__(self, task_id, port):
+    def __init__(self, task_id, connection):
         self.task_id = task_id
-        self.port = port
+        self.connection = connection
 
     def started(self):
         """Task started message"""
         self._send_message(type='started')
+        response_exception = _recv_message(self.connection).get('exception')
+        if response_exception:
+            raise response_exception
 
     def succeeded(self):
         """Task succeeded message"""
@@ -286,42 +528,17 @@ class _Messenger(object):
 
     def failed(self, exception):
         """Task failed message"""
-        self._send_message(type='failed', exception=exception)
+        self._send_message(type='failed', exception=_dump_exception(exception),
+                           traceback=exceptions.get_exception_as_string(*sys.exc_info()))
 
-    def closed(self):
-        """Executor closed message"""
-        self._send_message(type='closed')
+    def _send_message(self, type, **kwargs):
+        message = {'type': type, 'task_id': self.task_id}
+        message.update(kwargs)
+        _send_message(self.connection, [message])
 
-    def _send_message(self, type, exception=None):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect(('localhost', self.port))
-        try:
-            _send_message(sock, {
-                'type': type,
-                'task_id': self.task_id,
-                'exception': exceptions.wrap_if_needed(exception),
-                'traceback': exceptions.get_exception_as_string(*sys.exc_info()),
-            })
-            response = _recv_message(sock)
-            response_exception = response.get('exception')
-            if response_exception:
-                raise response_exception
-        finally:
-            sock.close()
 
-
-def _main():
-    arguments_json_path = sys.argv[1]
-    with open(arguments_json_path) as f:
-        arguments = pickle.loads(f.read())
-
-    # arguments_json_path is a temporary file created by the parent process.
-    # so we remove it here
-    os.remove(arguments_json_path)
-
-    task_id = arguments['task_id']
-    port = arguments['port']
-    messenger = _Messenger(task_id=task_id, port=port)
+def _run_task(connection, arguments):
+    messenger = _Messenger(task_id=arguments['task_id'], connection=connection)
 
     function = arguments['function']
     operation_arguments = arguments['operation_arguments']
@@ -336,7 +553,8 @@ def _main():
     try:
         messenger.started()
         task_func = imports.load_attribute(function)
-        aria.install_aria_extensions()
+        # The module of the function may have registered extensions of its own
+        extension.init()
         for decorate in process_executor.decorate():
             task_func = decorate(task_func)
         task_func(ctx=ctx, **operation_arguments)
@@ -346,5 +564,30 @@ def _main():
         ctx.close()
         messenger.failed(e)
 
+
+def _main():
+    port = int(sys.argv[1])
+    worker_id = sys.argv[2]
+    # Operations, and the processes they start, have no business with the token
+    token = os.environ.pop(_TOKEN_ENV_VAR)
+
+    with contextlib.closing(socket.create_connection(('localhost', port))) as connection:
+        _send_frame(connection, '{0} {1}'.format(worker_id, token))
+        aria.install_aria_extensions()
+        while True:
+            try:
+                arguments = _recv_message(connection)
+            except struct.error:
+                # The executor went away
+                break
+            if arguments is None:
+                break
+            _run_task(connection, arguments)
+            # The log handler of the task context is bound to its (now closed) storage
+            task_logger = logging.getLogger(TASK_LOGGER_NAME)
+            for handler in task_logger.handlers:
+                handler.close()
+            task_logger.handlers = []
+
 if __name__ == '__main__':
     _main()
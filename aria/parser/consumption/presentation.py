@@ -94,29 +94,54 @@ class Read(Consumer):
         # Link the context to this thread
         self.context.set_thread_local()
 
-        raw = self._read(location, origin_location)
-
-        if self.context.presentation.presenter_class is not None:
-            # The presenter class we specified in the context overrides everything
-            presenter_class = self.context.presentation.presenter_class
+        presentation = None
+        cache_key = None
+        cache = self.context.presentation.cache
+        if self.context.reading.reader is not None:
+            reader = self.context.reading.reader
+        else:
+            reader = self._get_reader(location, origin_location)
+            if (cache is not None) and (origin_location is not None):
+                # Only imports are cached, because they are merged into the importing presenter
+                # rather than being modified themselves
+                cache_key = cache.get_key(reader.loader.location, reader.load(),
+                                          self.context.presentation.presenter_class or
+                                          presenter_class)
+                presentation = cache.get(cache_key)
+
+        if presentation is not None:
+            presenter_class = presentation.__class__
         else:
-            try:
-                presenter_class = self.context.presentation.presenter_source.get_presenter(raw)
-            except PresenterNotFoundError:
+            raw = reader.read()
+
+            if self.context.presentation.presenter_class is not None:
+                # The presenter class we specified in the context overrides everything
+                presenter_class = self.context.presentation.presenter_class
+            else:
+                try:
+                    presenter_class = self.context.presentation.presenter_source.get_presenter(raw)
+                except PresenterNotFoundError:
+                    if presenter_class is None:
+                        raise
+                # We'll use the presenter class we were given (from the presenter that imported us)
                 if presenter_class is None:
-                    raise
-            # We'll use the presenter class we were given (from the presenter that imported us)
-            if presenter_class is None:
-                raise PresenterNotFoundError('presenter not found')
+                    raise PresenterNotFoundError('presenter not found')
 
-        presentation = presenter_class(raw=raw)
+            presentation = presenter_class(raw=raw)
 
-        if presentation is not None and hasattr(presentation, '_link_locators'):
-            presentation._link_locators()
+            if presentation is not None and hasattr(presentation, '_link_locators'):
+                presentation._link_locators()
+
+            if cache_key is not None:
+                cache.put(cache_key, presentation)
 
         # Submit imports to executor
         if hasattr(presentation, '_get_import_locations'):
             import_locations = presentation._get_import_locations(self.context)
+            if (cache_key is not None) and hasattr(presentation, '_reset_method_cache'):
+                # Cached presentations are shared by later parses, so they must not keep the
+                # results of methods cached by this context (which would keep it alive)
+                presentation._reset_method_cache()
             if import_locations:
                 for import_location in import_locations:
                     # The imports inherit the parent presenter class and use the current location as
@@ -127,11 +152,8 @@ class Read(Consumer):
 
         return presentation
 
-    def _read(self, location, origin_location):
-        if self.context.reading.reader is not None:
-            return self.context.reading.reader.read()
+    def _get_reader(self, location, origin_location):
         loader = self.context.loading.loader_source.get_loader(self.context.loading, location,
                                                                origin_location)
-        reader = self.context.reading.reader_source.get_reader(self.context.reading, location,
-                                                               loader)
-        return reader.read()
+        return self.context.reading.reader_source.get_reader(self.context.reading, location,
+                                                             loader)
@@ -20,6 +20,7 @@ Presentation package.
    :nosignatures:
 
    aria.parser.presentation.PresentationContext
+   aria.parser.presentation.PresentationCache
    aria.parser.presentation.PresenterException
    aria.parser.presentation.PresenterNotFoundError
    aria.parser.presentation.Field
@@ -95,6 +96,7 @@ Utilities
 
 from .exceptions import PresenterException, PresenterNotFoundError
 from .context import PresentationContext
+from .cache import PresentationCache
 from .presenter import Presenter
 from .presentation import Value, PresentationBase, Presentation, AsIsPresentation
 from .source import PresenterSource, DefaultPresenterSource
@@ -115,6 +117,7 @@ __all__ = (
     'PresenterException',
     'PresenterNotFoundError',
     'PresentationContext',
+    'PresentationCache',
     'Presenter',
     'Value',
     'PresentationBase',
@@ -0,0 +1,108 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import hashlib
+import threading
+
+from ...utils.caching import (load_pickle, store_pickle)
+from ...utils.collections import cls_name
+
+
+class PresentationCache(object):
+    """
+    Cache of presented imports, keyed by location and content hash.
+
+    Cached presentations are shared between parses and must be treated as immutable: presenters
+    must copy whatever they take from them (see :meth:`Presenter._merge_import`). Only the most
+    recent content of each location is kept.
+
+    :param directory: if provided, the raw data is also persisted in this directory so that it can
+     be reused by other processes
+    :type directory: basestring
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._presentations = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(location, data, presenter_class=None):
+        """
+        Creates a cache key for a location's loaded data.
+
+        :param location: canonical location from which the data was loaded
+        :param data: loaded data
+        :param presenter_class: presenter class used if the data does not specify one
+        """
+
+        if isinstance(data, unicode):
+            data = data.encode('utf-8')
+        presenter_class = cls_name(presenter_class) if presenter_class is not None else None
+        return (unicode(location), presenter_class), hashlib.sha1(data).hexdigest()
+
+    def get(self, key):
+        """
+        Gets a cached presentation, or ``None`` if not cached.
+        """
+
+        entry_key, digest = key
+        with self._lock:
+            entry = self._presentations.get(entry_key)
+        if (entry is not None) and (entry[0] == digest):
+            return entry[1]
+
+        presentation = self._load(key)
+        if presentation is not None:
+            with self._lock:
+                self._presentations[entry_key] = (digest, presentation)
+        return presentation
+
+    def put(self, key, presentation):
+        """
+        Caches a presentation. It must not be modified afterwards.
+        """
+
+        entry_key, digest = key
+        with self._lock:
+            self._presentations[entry_key] = (digest, presentation)
+        self._store(key, presentation)
+
+    def clear(self):
+        with self._lock:
+            self._presentations.clear()
+
+    def _get_path(self, key):
+        entry_key, digest = key
+        name = hashlib.sha1(repr(entry_key)).hexdigest()
+        return os.path.join(self.directory, '{0}-{1}.pickle'.format(name, digest))
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+        entry = load_pickle(self._get_path(key))
+        if entry is None:
+            return None
+        presenter_class, raw = entry
+        return presenter_class(raw=raw)
+
+    def _store(self, key, presentation):
+        if self.directory is not None:
+            store_pickle(self._get_path(key), (presentation.__class__, presentation._raw))
+
+
+#: Process-wide cache used by default
+PROCESS_CACHE = PresentationCache()
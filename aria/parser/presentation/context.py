@@ -15,6 +15,7 @@
 
 
 from .source import DefaultPresenterSource
+from .cache import PROCESS_CACHE
 
 
 class PresentationContext(object):
@@ -31,6 +32,8 @@ class PresentationContext(object):
     :vartype presenter_class: type
     :ivar import_profile: whether to import the profile by default (defaults to ``True``)
     :vartype import_profile: bool
+    :ivar cache: cache for presented imports (defaults to a process-wide cache; ``None`` to disable)
+    :vartype cache: ~aria.parser.presentation.PresentationCache
     :ivar threads: number of threads to use when reading data
     :vartype threads: int
     :ivar timeout: timeout in seconds for loading data
@@ -45,6 +48,7 @@ class PresentationContext(object):
         self.presenter_source = DefaultPresenterSource()
         self.presenter_class = None  # overrides
         self.import_profile = True
+        self.cache = PROCESS_CACHE
         self.threads = 8  # reasonable default for networking multithreading
         self.timeout = 10  # in seconds
         self.print_exceptions = False
@@ -13,7 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from ...utils.collections import merge
+from ...utils.collections import merge, copy_with_locators
 from ...utils.formatting import safe_repr
 from ..validation import Issue
 from .presentation import Presentation
@@ -51,9 +51,11 @@ class Presenter(Presentation):
         return True
 
     def _merge_import(self, presentation):
-        merge(self._raw, presentation._raw)
+        # The imported presentation may be cached and shared, so we must not merge its containers
+        # (or its locators) into ours as is: they would be modified by subsequent merges
+        merge(self._raw, copy_with_locators(presentation._raw))
         if hasattr(self._raw, '_locator') and hasattr(presentation._raw, '_locator'):
-            self._raw._locator.merge(presentation._raw._locator)
+            self._raw._locator.merge(presentation._raw._locator.copy())
 
     def _link_locators(self):
         if hasattr(self._raw, '_locator'):
@@ -26,6 +26,7 @@ Reading package.
    Locator
    RawReader
    Reader
+   ReaderCache
    ReaderSource
    DefaultReaderSource
    YamlReader
@@ -38,6 +39,7 @@ from .locator import Locator
 from .json import JsonReader
 from .jinja import JinjaReader
 from .context import ReadingContext
+from .cache import ReaderCache
 from .source import ReaderSource, DefaultReaderSource
 from .exceptions import (ReaderException,
                          ReaderNotFoundError,
@@ -50,6 +52,7 @@ __all__ = (
     'ReaderSyntaxError',
     'AlreadyReadException',
     'Reader',
+    'ReaderCache',
     'ReaderSource',
     'DefaultReaderSource',
     'ReadingContext',
@@ -0,0 +1,53 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import hashlib
+
+from ...utils.caching import (load_pickle, store_pickle)
+
+
+class ReaderCache(object):
+    """
+    On-disk cache of agnostic raw data, together with its locators.
+
+    Entries are keyed by location and content hash, so changed files are simply read again. Every
+    hit returns a new copy of the raw data, which may then be modified freely.
+
+    :param directory: directory in which to store the cache files
+    :type directory: basestring
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def get(self, location, data):
+        """
+        Gets the cached raw data for the loaded data, or ``None`` if not cached.
+        """
+
+        return load_pickle(self._get_path(location, data))
+
+    def put(self, location, data, raw):
+        """
+        Caches the raw data read from the loaded data.
+        """
+
+        store_pickle(self._get_path(location, data), raw)
+
+    def _get_path(self, location, data):
+        if isinstance(data, unicode):
+            data = data.encode('utf-8')
+        digest = hashlib.sha1(unicode(location).encode('utf-8'))
+        digest.update('\0')
+        digest.update(data)
+        return os.path.join(self.directory, '{0}.pickle'.format(digest.hexdigest()))
@@ -22,10 +22,13 @@ class ReadingContext(object):
     :vartype reader_source: ReaderSource
     :ivar reader: overrides ``reader_source`` with a specific class
     :vartype reader: type
+    :ivar cache: optional on-disk cache for raw data read from YAML
+    :vartype cache: ReaderCache
     """
 
     def __init__(self):
         self.reader_source = DefaultReaderSource()
         self.reader = None
+        self.cache = None
 
         self._locations = LockedList()  # for keeping track of locations already read
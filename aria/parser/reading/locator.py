@@ -99,6 +99,20 @@ class Locator(object):
                 else:
                     self.children[k] = loc
 
+    def copy(self):
+        """
+        Copies the locator and its children, recursively.
+        """
+
+        children = self.children
+        if isinstance(children, list):
+            children = [child.copy() for child in children]
+        elif isinstance(children, dict):
+            children = dict((k, child.copy()) for k, child in children.iteritems())
+        locator = self.__class__(self.location, self.line, self.column)
+        locator.children = children
+        return locator
+
     def dump(self, key=None):
         if key:
             puts('%s "%s":%d:%d' %
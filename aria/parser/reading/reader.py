@@ -25,8 +25,13 @@ class Reader(object):
         self.context = context
         self.location = location
         self.loader = loader
+        self._data = None
 
     def load(self):
+        # Data is loaded only once, so that it can be inspected before reading
+        if self._data is not None:
+            return self._data
+
         with OpenClose(self.loader) as loader:
             if self.context is not None:
                 with self.context._locations:
@@ -38,6 +43,7 @@ class Reader(object):
             data = loader.load()
             if data is None:
                 raise ReaderException('loader did not provide data: %s' % loader)
+            self._data = data
             return data
 
     def read(self):
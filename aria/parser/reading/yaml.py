@@ -77,6 +77,20 @@ class YamlReader(Reader):
 
     def read(self):
         data = self.load()
+
+        cache = getattr(self.context, 'cache', None)
+        if cache is not None:
+            raw = cache.get(self.loader.location, data)
+            if raw is not None:
+                return raw
+
+        raw = self._read(data)
+
+        if cache is not None:
+            cache.put(self.loader.location, data, raw)
+        return raw
+
+    def _read(self, data):
         try:
             data = unicode(data)
             # see issue here:
@@ -54,6 +54,13 @@ class ModelAPI(StorageAPI):
             self._thread_local._instrumentation = []
         return self._thread_local._instrumentation
 
+    @property
+    def _batch_depth(self):
+        return getattr(self._thread_local, '_batch_depth', 0)
+
+    @_batch_depth.setter
+    def _batch_depth(self, value):
+        self._thread_local._batch_depth = value
 
     @property
     def name(self):
@@ -18,6 +18,7 @@ Storage API management.
 """
 
 import copy
+import sys
 from contextlib import contextmanager
 
 from aria.logger import LoggerMixin
@@ -146,6 +147,32 @@ class ModelStorage(Storage):
         for mapi in self.registered.itervalues():
             mapi.drop()
 
+    @contextmanager
+    def batch(self):
+        """
+        Defers the commits of all MAPIs in the current thread to the end of the block, so all the
+        changes made within it are written in a single transaction (which is rolled back if the
+        block raises). Batches may be nested, in which case the outermost one commits.
+        """
+        mapis = self.registered.values()
+        for mapi in mapis:
+            mapi._begin_batch()
+        commit = False
+        try:
+            yield self
+            commit = True
+        finally:
+            # Every MAPI must end its batch, even if committing through another one failed
+            error = None
+            for mapi in mapis:
+                try:
+                    mapi._end_batch(commit=commit)
+                except BaseException:
+                    error = error or sys.exc_info()
+            if error is not None:
+                type_, value, trace = error
+                raise type_, value, trace
+
     @contextmanager
     def instrument(self, *instrumentation):
         original_instrumentation = {}
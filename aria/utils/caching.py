@@ -19,6 +19,9 @@ Caching utilities.
 
 from __future__ import absolute_import  # so we can import standard 'collections' and 'threading'
 
+import os
+import tempfile
+import cPickle as pickle
 from threading import Lock
 from functools import partial
 
@@ -135,3 +138,45 @@ class HasCachedMethods(object):
                 entry = entry.fget
             if hasattr(entry, 'reset_cache_info'):
                 entry.reset_cache_info()
+
+
+def load_pickle(path):
+    """
+    Loads a value stored by :func:`store_pickle`.
+
+    :return: the value, or ``None`` if the file is missing or unreadable
+    """
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:                                                                               # pylint: disable=broad-except
+        return None
+
+
+def store_pickle(path, value):
+    """
+    Stores a value in a file, for on-disk caches.
+
+    The value is written to a temporary file first, so that other processes never see partial
+    files. Failures are ignored, since a cache is an optimization only.
+    """
+    directory = os.path.dirname(path)
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        temp_file, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    except Exception:                                                                               # pylint: disable=broad-except
+        return
+    try:
+        with os.fdopen(temp_file, 'wb') as f:
+            pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+        try:
+            os.rename(temp_path, path)
+        except OSError:
+            # Windows does not rename onto existing files; the existing file holds the same entry
+            os.remove(temp_path)
+    except Exception:                                                                               # pylint: disable=broad-except
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
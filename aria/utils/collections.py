@@ -281,6 +281,31 @@ def deepcopy_with_locators(value):
     return res
 
 
+def copy_with_locators(value):
+    """
+    Copies lists and dicts recursively, also copying over their locators.
+
+    Unlike :func:`deepcopy_with_locators`, other values are shared rather than copied.
+    """
+
+    if isinstance(value, list):
+        res = [copy_with_locators(v) for v in value]
+    elif isinstance(value, dict):
+        res = value.__class__()
+        for k, v in value.iteritems():
+            res[k] = copy_with_locators(v)
+    else:
+        return value
+
+    locator = getattr(value, '_locator', None)
+    if locator is not None:
+        try:
+            setattr(res, '_locator', locator)
+        except AttributeError:
+            pass
+    return res
+
+
 def copy_locators(target, source):
     """
     Copies over ``_locator`` for all elements, recursively.
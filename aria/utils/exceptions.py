@@ -112,9 +112,9 @@ class _WrappedException(Exception):
         self.exception_str = exception_str
 
 
-def wrap_if_needed(exception):
+def wrap_if_needed(exception, dumps=jsonpickle.dumps, loads=jsonpickle.loads):
     try:
-        jsonpickle.loads(jsonpickle.dumps(exception))
+        loads(dumps(exception))
         return exception
     except BaseException:
         return _WrappedException(type(exception).__name__, str(exception))
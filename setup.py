@@ -48,6 +48,10 @@ install_requires = []
 ssh_requires = [
     'Fabric>=1.13.0, <1.14',
 ]
+postgresql_requires = [
+    'psycopg2>=2.7, <2.8'
+]
+
 win_ssh_requires = [
     # Fabric depends on the pypiwin32 on Windows, but doesn't install it
     'pypiwin32==219'
@@ -55,6 +59,7 @@ win_ssh_requires = [
 
 extras_require = {
     'ssh': ssh_requires,
+    'postgresql': postgresql_requires,
     'ssh:sys_platform=="win32"': win_ssh_requires
 }
 
@@ -40,9 +40,10 @@ def inmemory_model():
 
 @pytest.fixture
 def fs_model(tmpdir):
+    initiator, initiator_kwargs = storage.get_model_storage_initiator(str(tmpdir))
     result = application_model_storage(sql_mapi.SQLAlchemyModelAPI,
-                                       initiator_kwargs=dict(base_dir=str(tmpdir)),
-                                       initiator=sql_mapi.init_storage)
+                                       initiator_kwargs=initiator_kwargs,
+                                       initiator=initiator)
     yield result
     storage.release_sqlite_storage(result)
 
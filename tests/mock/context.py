@@ -23,13 +23,15 @@ from aria.storage import (
 )
 
 from . import models
-from ..storage import init_inmemory_model_storage
+from ..storage import init_inmemory_model_storage, get_model_storage_initiator
 from .topology import create_simple_topology_two_nodes
 
 
 def simple(tmpdir, inmemory=False, context_kwargs=None, topology=None):
-    initiator = init_inmemory_model_storage if inmemory else None
-    initiator_kwargs = {} if inmemory else dict(base_dir=tmpdir)
+    if inmemory:
+        initiator, initiator_kwargs = init_inmemory_model_storage, {}
+    else:
+        initiator, initiator_kwargs = get_model_storage_initiator(tmpdir)
     topology = topology or create_simple_topology_two_nodes
 
     model_storage = aria.application_model_storage(
@@ -13,6 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import cPickle as pickle
+
 import pytest
 
 import sqlalchemy
@@ -22,12 +24,16 @@ from aria.storage import (
     sql_mapi
 )
 from aria import modeling
+from aria.modeling import functions
 from aria.modeling.exceptions import ValueFormatException
+from aria.modeling.utils import reencode_parameter_values
 
 from ..storage import (
     release_sqlite_storage,
-    init_inmemory_model_storage
+    init_inmemory_model_storage,
+    DATABASE_URL
 )
+from ..parser.service_templates import consume_literal
 from . import MockModel
 from ..mock import (
     models,
@@ -213,3 +219,127 @@ def test_strict_list():
     assert_strict(strict_class)
     with pytest.raises(ValueFormatException):
         strict_class.strict_list[0] = 1
+
+
+class MockFunction(functions.Function):
+
+    def __init__(self, name):
+        self.name = name
+
+    def __evaluate__(self, container_holder):
+        return functions.Evaluation('evaluated {0}'.format(self.name), final=True)
+
+
+def _put_property(context, value):
+    node = context.model.node.get_by_name(models.DEPENDENCY_NODE_NAME)
+    node.properties['mock_property'] = modeling.models.Property.wrap('mock_property', value)
+    context.model.node.update(node)
+    return node.properties['mock_property'].id
+
+
+def _get_property(context, property_id):
+    context.model.property._session.expire_all()
+    return context.model.property.get(property_id)
+
+
+def _get_raw_value(context, property_id):
+    return context.model.property._engine.execute(
+        sqlalchemy.text('SELECT _value FROM property WHERE id = :id'), id=property_id).scalar()
+
+
+@pytest.mark.parametrize('value', [
+    'value',
+    1,
+    None,
+    [1, 'two', [3.0]],
+    {'key': {'nested': True}},
+    {1: 'non-string key', '$key': 'tag-like key'},
+    {'$key': 'tag-like key'},
+    (1, 'tuple'),
+    set([1, 2])
+])
+def test_parameter_value_encoding(context, value):
+    property_id = _put_property(context, value)
+    assert _get_property(context, property_id).value == value
+
+
+def test_parameter_value_stored_as_json(context):
+    property_id = _put_property(context, {'key': ['value']})
+    assert _get_raw_value(context, property_id) == '{"key":["value"]}'
+
+
+def test_parameter_value_function(context):
+    property_id = _put_property(context, [MockFunction('function')])
+    the_property = _get_property(context, property_id)
+    assert isinstance(the_property._value[0], MockFunction)
+    assert the_property._value[0].name == 'function'
+    assert the_property.value == ['evaluated function']
+
+
+def test_parameter_value_not_function_class(context):
+    property_id = _put_property(context, 'value')
+    context.model.property._engine.execute(
+        sqlalchemy.text('UPDATE property SET _value = :value WHERE id = :id'),
+        value='{"$function":["aria.utils.collections.OrderedDict",{}]}', id=property_id)
+    with pytest.raises(ValueFormatException):
+        _get_property(context, property_id)
+
+
+def test_parameter_value_tosca_function(context):
+    template_context, _ = consume_literal(TOSCA_FUNCTION_TEMPLATE, consumer_class_name='template')
+    node_template = template_context.modeling.template.node_templates['node']
+    value = node_template.properties['second']._value
+    assert type(value).__name__ == 'Concat'
+
+    property_id = _put_property(context, value)
+    stored_value = _get_property(context, property_id)._value
+    assert type(stored_value) is type(value)
+    assert type(stored_value.string_expressions[0]) is type(value.string_expressions[0])
+    assert stored_value.as_raw == value.as_raw
+    assert stored_value.locator.line == value.locator.line
+
+
+TOSCA_FUNCTION_TEMPLATE = """
+tosca_definitions_version: tosca_simple_yaml_1_0
+
+node_types:
+  Node:
+    derived_from: tosca.nodes.Root
+    properties:
+      first:
+        type: string
+      second:
+        type: string
+
+topology_template:
+  node_templates:
+    node:
+      type: Node
+      properties:
+        first: value
+        second: { concat: [ { get_property: [ SELF, first ] }, ' suffix' ] }
+"""
+
+
+@pytest.mark.skipif(DATABASE_URL, reason='legacy values are binary, so they need a SQLite database')
+def test_parameter_value_legacy_pickle(context):
+    property_id = _put_property(context, 'value')
+    legacy_value = pickle.dumps({'key': 'legacy value'}, pickle.HIGHEST_PROTOCOL)
+    context.model.property._engine.execute(
+        sqlalchemy.text('UPDATE property SET _value = :value WHERE id = :id')
+        .bindparams(sqlalchemy.bindparam('value', type_=sqlalchemy.LargeBinary)),
+        value=legacy_value, id=property_id)
+    assert _get_property(context, property_id).value == {'key': 'legacy value'}
+
+    reencode_parameter_values(context.model)
+    assert _get_raw_value(context, property_id) == '{"key":"legacy value"}'
+    assert _get_property(context, property_id).value == {'key': 'legacy value'}
+
+
+def test_parameter_value_malformed(context):
+    property_id = _put_property(context, 'value')
+    context.model.property._engine.execute(
+        sqlalchemy.text('UPDATE property SET _value = :value WHERE id = :id'),
+        value='not json', id=property_id)
+    with pytest.raises(ValueFormatException):
+        _get_property(context, property_id)
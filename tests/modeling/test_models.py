@@ -833,6 +833,33 @@ class TestType(object):
         assert super_type.hierarchy == [super_type, additional_type]
         assert sub_type.hierarchy == [sub_type, super_type, additional_type]
 
+    def test_type_descendants(self):
+        root = Type(variant='variant', name='root')
+        first = Type(variant='variant', name='first')
+        root.children.append(first)
+        assert root.get_descendant('first') is first
+        assert root.get_descendant('second') is None
+
+        # Adding to an indexed hierarchy
+        second = Type(variant='variant', name='second')
+        first.children.append(second)
+        assert root.get_descendant('second') is second
+        assert first.get_descendant('second') is second
+        assert second.get_descendant('first') is None
+        assert root.is_descendant('first', 'second')
+        assert not root.is_descendant('second', 'first')
+
+        # Moving within the hierarchy
+        first.children.remove(second)
+        root.children.append(second)
+        assert root.get_descendant('second') is second
+        assert first.get_descendant('second') is None
+
+        # Renaming
+        second.name = 'renamed'
+        assert root.get_descendant('second') is None
+        assert root.get_descendant('renamed') is second
+
 
 class TestParameter(object):
 
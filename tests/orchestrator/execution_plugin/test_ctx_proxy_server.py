@@ -15,6 +15,7 @@
 
 import os
 import time
+import threading
 import sys
 import subprocess
 import StringIO
@@ -105,6 +106,33 @@ class TestCtxProxy(object):
         response = self.request(server, 'stub_method', *args)
         assert response == args[1:-1]
 
+    def test_batch_request(self, server):
+        response = self.batch_request(server, ['stub_attr', 'some_property'], ['stub_none'])
+        assert response['type'] == 'batch'
+        assert [result['type'] for result in response['payload']] == ['result', 'result']
+        assert [result['payload'] for result in response['payload']] == ['some_value', None]
+
+    def test_batch_request_stops_at_error(self, server):
+        response = self.batch_request(server,
+                                      ['stub_attr', 'some_property'],
+                                      ['property_that_does_not_exist'],
+                                      ['stub_none'])
+        assert [result['type'] for result in response['payload']] == ['result', 'error']
+
+    def test_instrumentation_set_up_once(self, server, ctx):
+        self.request(server, 'stub_attr', 'some_property')
+        self.request(server, 'stub_attr', 'some_property')
+        self.batch_request(server, ['stub_none'], ['stub_none'])
+        assert ctx.model.instrument.call_count == 1
+
+    def test_client_batch_request(self, server):
+        responses = ctx_proxy.client._client_batch_request(
+            server.socket_url,
+            args_list=[['stub_attr', 'some_property'], ['stub-method', '[', 'arg', ']']],
+            timeout=5)
+        assert [ctx_proxy.client._get_payload(response) for response in responses] == \
+            ['some_value', ['arg']]
+
     class StubAttribute(object):
         some_property = 'some_value'
 
@@ -171,6 +199,73 @@ class TestCtxProxy(object):
     def request(self, server, *args):
         return ctx_proxy.client._client_request(server.socket_url, args, timeout=5)
 
+    def batch_request(self, server, *args_list):
+        return ctx_proxy.client._http_request(
+            server.socket_url,
+            request={'batch': [{'args': args} for args in args_list]},
+            method='POST',
+            timeout=5)
+
+
+class TestCtxMultiplexer(object):
+
+    def test_routes_to_own_ctx(self, multiplexer, mocker):
+        ctx1, ctx2 = self._ctx(mocker, 1, 'value1'), self._ctx(mocker, 2, 'value2')
+        with multiplexer.route(ctx1) as route1:
+            with multiplexer.route(ctx2) as route2:
+                assert self.request(multiplexer, route1, 'value') == 'value1'
+                assert self.request(multiplexer, route2, 'value') == 'value2'
+
+    def test_patches_ctx_once(self, multiplexer, mocker):
+        ctx = self._ctx(mocker, 1, 'value')
+        patcher = mocker.MagicMock()
+        with multiplexer.route(ctx, patcher) as route:
+            self.request(multiplexer, route, 'value')
+            self.request(multiplexer, route, 'value')
+        patcher.assert_called_once_with(ctx)
+
+    def test_concurrent_routes(self, multiplexer, mocker):
+        ctx1, ctx2 = self._ctx(mocker, 1, 'value1'), self._ctx(mocker, 2, 'value2')
+        ctx1.sleep = ctx2.sleep = TestCtxProxy.stub_sleep
+        with multiplexer.route(ctx1) as route1:
+            with multiplexer.route(ctx2) as route2:
+                # a slow request on one route does not hold back the other
+                thread = threading.Thread(target=self.request,
+                                          args=(multiplexer, route1, 'sleep', '[', '1', ']'))
+                thread.start()
+                try:
+                    start = time.time()
+                    assert self.request(multiplexer, route2, 'value') == 'value2'
+                    assert time.time() - start < 1
+                finally:
+                    thread.join()
+
+    def test_unknown_route(self, multiplexer, mocker):
+        with multiplexer.route(self._ctx(mocker, 1, 'value')) as route:
+            pass
+        with pytest.raises(ctx_proxy.client._RequestError):
+            self.request(multiplexer, route, 'value')
+
+    @staticmethod
+    def _ctx(mocker, task_id, value):
+        class MockCtx(object):
+            INSTRUMENTATION_FIELDS = ()
+        ctx = MockCtx()
+        ctx.task = mocker.MagicMock(id=task_id)
+        ctx.model = mocker.MagicMock()
+        ctx.value = value
+        return ctx
+
+    @pytest.fixture
+    def multiplexer(self):
+        result = ctx_proxy.server.CtxMultiplexer()
+        yield result
+        result.close()
+
+    def request(self, multiplexer, route, *args):
+        return ctx_proxy.client._client_request('{0}/{1}'.format(multiplexer.socket_url, route),
+                                                args, timeout=5)
+
 
 class TestArgumentParsing(object):
 
@@ -239,6 +334,51 @@ class TestArgumentParsing(object):
         self.assert_valid_output([], '[]', '[]')
         self.assert_valid_output({}, '{}', '{}')
 
+    def test_batch_expressions(self, mocker):
+        batch_request = mocker.patch.object(ctx_proxy.client, '_client_batch_request',
+                                            return_value=[{'type': 'result', 'payload': 'value'},
+                                                          {'type': 'result', 'payload': 1}])
+        output = self._capture_output(
+            ['-e', 'node properties prop', '-e', 'node "some prop" @1'])
+        batch_request.assert_called_once_with(
+            'stub', args_list=[['node', 'properties', 'prop'], ['node', 'some prop', 1]],
+            timeout=30)
+        assert output == 'value\n1\n'
+
+    def test_batch_stdin(self, mocker):
+        batch_request = mocker.patch.object(ctx_proxy.client, '_client_batch_request',
+                                            return_value=[{'type': 'result', 'payload': 'a'},
+                                                          {'type': 'result', 'payload': 'b'}])
+        mocker.patch('sys.stdin', StringIO.StringIO('node a\n\nnode b\n'))
+        output = self._capture_output(['--stdin', '-j'])
+        batch_request.assert_called_once_with(
+            'stub', args_list=[['node', 'a'], ['node', 'b']], timeout=30)
+        assert output == '"a"\n"b"\n'
+
+    def test_batch_error(self, mocker):
+        mocker.patch.object(ctx_proxy.client, '_client_batch_request',
+                            return_value=[{'type': 'result', 'payload': 'a'},
+                                          {'type': 'error',
+                                           'payload': {'type': 'CtxError', 'message': 'error',
+                                                       'traceback': ''}}])
+        with pytest.raises(ctx_proxy.client._RequestError):
+            self._capture_output(['-e', 'node a', '-e', 'node b'])
+
+    def test_batch_with_positional_args(self):
+        with pytest.raises(SystemExit):
+            ctx_proxy.client.main(['-e', 'node a', 'node', 'b'])
+
+    @staticmethod
+    def _capture_output(args):
+        current_stdout = sys.stdout
+        output = StringIO.StringIO()
+        sys.stdout = output
+        try:
+            ctx_proxy.client.main(args)
+        finally:
+            sys.stdout = current_stdout
+        return output.getvalue()
+
     def assert_valid_output(self, response, ex_typed_output, ex_json_output):
         self.mock_response = response
         current_stdout = sys.stdout
@@ -15,6 +15,7 @@
 
 import json
 import os
+import Queue
 
 import pytest
 
@@ -165,6 +166,26 @@ class TestLocalRunScript(object):
         assert exception.stdout.strip() == '123123'
         assert 'command_that_does_not_exist' in exception.stderr
 
+    def test_script_error_with_stream_output(self, executor, workflow_context, tmpdir):
+        script_path = self._create_script(
+            tmpdir,
+            linux_script='''#! /bin/bash -e
+            echo 123123
+            command_that_does_not_exist [ ]
+            ''',
+            windows_script='''
+            @echo off
+            echo 123123
+            command_that_does_not_exist [ ]
+            ''')
+        exception = self._run_and_get_task_exception(
+            executor, workflow_context,
+            script_path=script_path,
+            process={'stream_output': True})
+        assert isinstance(exception, ProcessException)
+        assert exception.stdout.strip() == '123123'
+        assert 'command_that_does_not_exist' in exception.stderr
+
     def test_script_error_from_bad_ctx_request(self, executor, workflow_context, tmpdir):
         script_path = self._create_script(
             tmpdir,
@@ -523,6 +544,47 @@ if __name__ == '__main__':
         storage.release_sqlite_storage(workflow_context.model)
 
 
+class TestOutputConsumer(object):
+
+    def test_stream_output(self):
+        read_fd, write_fd = os.pipe()
+        batches = Queue.Queue()
+        logged = []
+        consumer = local._OutputConsumer(os.fdopen(read_fd, 'rb'), batches, logged.append,
+                                         tail_size=8)
+        with os.fdopen(write_fd, 'wb') as out:
+            out.write('line1\nline2\npartial')
+        local._log_output_batches(batches, consumers_count=1)
+        consumer.join()
+        assert '\n'.join(logged) == 'line1\nline2\npartial'
+        assert consumer.read_output() == '\npartial'
+
+    def test_stream_output_without_newlines(self, monkeypatch):
+        monkeypatch.setattr(local, '_READ_SIZE', 4)
+        read_fd, write_fd = os.pipe()
+        batches = Queue.Queue()
+        logged = []
+        consumer = local._OutputConsumer(os.fdopen(read_fd, 'rb'), batches, logged.append)
+        with os.fdopen(write_fd, 'wb') as out:
+            out.write('progress\rprogress\rprogress')
+        local._log_output_batches(batches, consumers_count=1)
+        consumer.join()
+        assert ''.join(logged) == 'progress\rprogress\rprogress'
+        # Parts are put once they reach the read size, rather than at the end of the line
+        assert max(len(text) for text in logged) < 2 * 4
+
+    def test_output_tail(self):
+        tail = local._OutputTail(5)
+        tail.write('123')
+        assert tail.getvalue() == '123'
+        tail.write('4567')
+        assert tail.getvalue() == '34567'
+        tail.write('89')
+        assert tail.getvalue() == '56789'
+        tail.write('abcdefgh')
+        assert tail.getvalue() == 'defgh'
+
+
 class BaseTestConfiguration(object):
 
     @pytest.fixture(autouse=True)
@@ -17,6 +17,8 @@ import contextlib
 import json
 import logging
 import os
+import tarfile
+import StringIO
 
 import pytest
 
@@ -496,6 +498,7 @@ class TestUtilityFunctions(object):
         assert paths.remote_work_dir == '/path/work'
         assert paths.remote_env_script_path.startswith('/path/scripts/env-path.py-')
         assert paths.remote_script_path.startswith('/path/scripts/path.py-')
+        assert paths.remote_bundle_path == '{0}.tar'.format(paths.remote_script_path)
 
     def test_write_environment_script_file(self):
         base_dir = '/path'
@@ -521,3 +524,32 @@ class TestUtilityFunctions(object):
             'export one=\'1\''
         ])
         assert env_script_lines == expected_env_script_lines
+
+    def test_write_bundle_file(self, tmpdir):
+        local_script_path = str(tmpdir.join('script.sh'))
+        with open(local_script_path, 'w') as f:
+            f.write('echo hello')
+        paths = ssh_operations._Paths(base_dir='/path', local_script_path=local_script_path)
+        env_script = StringIO.StringIO('export one=1\n')
+        bundle = ssh_operations._write_bundle_file(paths, env_script)
+        with tarfile.open(fileobj=bundle) as tar:
+            script_name = os.path.basename(paths.remote_script_path)
+            env_script_name = os.path.basename(paths.remote_env_script_path)
+            assert set(tar.getnames()) == set([script_name, env_script_name])
+            assert tar.extractfile(script_name).read() == 'echo hello'
+            assert tar.extractfile(env_script_name).read() == 'export one=1\n'
+            for member in tar.getmembers():
+                assert (member.uid, member.gid, member.uname, member.gname) == (0, 0, '', '')
+
+    def test_upload_ctx_client_once_per_host(self, mocker):
+        mocker.patch.object(ssh_operations, '_uploaded_ctx_clients', set())
+        exists = mocker.patch('fabric.contrib.files.exists', return_value=False)
+        run = mocker.patch('fabric.api.run')
+        put = mocker.patch('fabric.api.put')
+        paths = ssh_operations._Paths(base_dir='/path', local_script_path='/local/script.sh')
+        for host_string in ('user@host1', 'user@host1', 'user@host2'):
+            with fabric.api.settings(host_string=host_string):
+                ssh_operations._upload_ctx_client(paths)
+        assert exists.call_count == 2
+        assert run.call_count == 2
+        assert put.call_count == 2
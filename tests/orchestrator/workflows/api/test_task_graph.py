@@ -176,6 +176,23 @@ class TestTaskGraphTasks(object):
 
 class TestTaskGraphGraphTraversal(object):
 
+    def test_topological_order(self, graph):
+        task_1, task_2, task_3, other_task = MockTask(), MockTask(), MockTask(), MockTask()
+        graph.sequence(task_1, task_2, task_3)
+        graph.add_tasks(other_task)
+        order = list(graph.topological_order())
+        assert order.index(task_3) < order.index(task_2) < order.index(task_1)
+        assert list(graph.topological_order(reverse=True)) == \
+            [task_1, other_task, task_2, task_3]
+
+    def test_topological_order_with_cycle(self, graph):
+        task, other_task = MockTask(), MockTask()
+        graph.add_tasks(task, other_task)
+        graph.add_dependency(task, other_task)
+        graph.add_dependency(other_task, task)
+        with pytest.raises(task_graph.TaskGraphCycleError):
+            list(graph.topological_order())
+
     def test_tasks_iteration(self, graph):
         task = MockTask()
         other_task = MockTask()
@@ -0,0 +1,90 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import time
+from collections import namedtuple
+
+import pytest
+
+from aria.orchestrator.workflows.api import task, task_graph
+from aria.orchestrator.workflows.builtin import workflows
+
+
+class _Node(object):
+    # Counts the reads of node names, which is how tasks are matched to nodes
+    name_reads = 0
+
+    def __init__(self, name, outbound_relationships):
+        self._name = name
+        self.outbound_relationships = outbound_relationships
+
+    @property
+    def name(self):
+        _Node.name_reads += 1
+        return self._name
+
+
+_Relationship = namedtuple('_Relationship', ('target_node',))
+
+
+def test_create_node_task_dependencies():
+    graph, tasks_and_nodes = _build_install_graph(3)
+    (task1, _), (task2, _), (task3, _) = tasks_and_nodes
+    assert list(graph.get_dependencies(task1)) == []
+    assert list(graph.get_dependencies(task2)) == [task1]
+    assert list(graph.get_dependencies(task3)) == [task2]
+
+    graph, tasks_and_nodes = _build_install_graph(3, reverse=True)
+    (task1, _), (task2, _), (task3, _) = tasks_and_nodes
+    assert list(graph.get_dependencies(task1)) == [task2]
+    assert list(graph.get_dependencies(task3)) == []
+
+
+def test_create_node_task_dependencies_scales_linearly():
+    # Every node name is read a constant number of times (once for the node and once for each of
+    # its two relationships), rather than once for every other node
+    for nodes_count in (1000, 10000):
+        _Node.name_reads = 0
+        _build_install_graph(nodes_count, relate_to_first=True)
+        assert _Node.name_reads <= 3 * nodes_count
+
+
+@pytest.mark.skipif(not os.environ.get('ARIA_BENCHMARK'),
+                    reason='benchmark; set ARIA_BENCHMARK and run pytest with -s to see the timings')
+def test_create_node_task_dependencies_benchmark():
+    for nodes_count in (1000, 10000):
+        start = time.time()
+        _build_install_graph(nodes_count, relate_to_first=True)
+        print '\ninstall graph of {0} nodes built in {1:.3f} seconds'.format(
+            nodes_count, time.time() - start)
+
+
+def _build_install_graph(nodes_count, reverse=False, relate_to_first=False):
+    # Every node has a relationship to the previous one, and optionally to the first one
+    nodes = []
+    for i in range(nodes_count):
+        relationships = []
+        if i > 0:
+            relationships.append(_Relationship(nodes[i - 1]))
+            if relate_to_first:
+                relationships.append(_Relationship(nodes[0]))
+        nodes.append(_Node('node_{0}'.format(i), relationships))
+
+    graph = task_graph.TaskGraph('install')
+    tasks_and_nodes = [(task.StubTask(ctx=object()), node) for node in nodes]
+    graph.add_tasks([api_task for api_task, _ in tasks_and_nodes])
+    workflows.create_node_task_dependencies(graph, tasks_and_nodes, reverse=reverse)
+    return graph, tasks_and_nodes
@@ -28,7 +28,7 @@ from aria.orchestrator.workflows import (
     api,
     exceptions,
 )
-from aria.orchestrator.workflows.core import engine, graph_compiler
+from aria.orchestrator.workflows.core import engine, graph_compiler, scheduling
 from aria.orchestrator.workflows.executor import thread
 
 from tests import mock, storage
@@ -40,19 +40,20 @@ global_test_holder = {}
 class BaseTest(object):
 
     @classmethod
-    def _execute(cls, workflow_func, workflow_context, executor):
+    def _execute(cls, workflow_func, workflow_context, executor, **engine_kwargs):
         eng = cls._engine(workflow_func=workflow_func,
                           workflow_context=workflow_context,
-                          executor=executor)
+                          executor=executor,
+                          **engine_kwargs)
         eng.execute(ctx=workflow_context)
         return eng
 
     @staticmethod
-    def _engine(workflow_func, workflow_context, executor):
+    def _engine(workflow_func, workflow_context, executor, **engine_kwargs):
         graph = workflow_func(ctx=workflow_context)
         graph_compiler.GraphCompiler(workflow_context, executor.__class__).compile(graph)
 
-        return engine.Engine(executors={executor.__class__: executor})
+        return engine.Engine(executors={executor.__class__: executor}, **engine_kwargs)
 
     @staticmethod
     def _create_interface(ctx, func, arguments=None):
@@ -237,6 +238,63 @@ class TestEngine(BaseTest):
         assert global_test_holder.get('invocations') == [1, 2]
         assert global_test_holder.get('sent_task_signal_calls') == 2
 
+    def test_polling_execution_order(self, workflow_context, executor):
+        node, _, operation_name = self._create_interface(
+            workflow_context, mock_ordered_task, {'counter': 1})
+
+        @workflow
+        def mock_workflow(ctx, graph):
+            op1 = self._op(node, operation_name, arguments={'counter': 1})
+            op2 = self._op(node, operation_name, arguments={'counter': 2})
+            graph.sequence(op1, op2)
+        self._execute(
+            workflow_func=mock_workflow,
+            workflow_context=workflow_context,
+            executor=executor,
+            event_driven=False)
+        assert workflow_context.states == ['start', 'success']
+        assert workflow_context.exception is None
+        assert global_test_holder.get('invocations') == [1, 2]
+        assert global_test_holder.get('sent_task_signal_calls') == 2
+
+    def test_fifo_scheduling_execution_order(self, workflow_context, executor):
+        node, _, operation_name = self._create_interface(
+            workflow_context, mock_ordered_task, {'counter': 1})
+
+        @workflow
+        def mock_workflow(ctx, graph):
+            op1 = self._op(node, operation_name, arguments={'counter': 1})
+            op2 = self._op(node, operation_name, arguments={'counter': 2})
+            graph.sequence(op1, op2)
+        self._execute(
+            workflow_func=mock_workflow,
+            workflow_context=workflow_context,
+            executor=executor,
+            scheduling_policy=scheduling.FifoPolicy)
+        assert workflow_context.states == ['start', 'success']
+        assert workflow_context.exception is None
+        assert global_test_holder.get('invocations') == [1, 2]
+
+    def test_max_concurrent_tasks(self, workflow_context, executor):
+        node, _, operation_name = self._create_interface(
+            workflow_context, mock_sleep_task, {'seconds': 0.1})
+
+        @workflow
+        def mock_workflow(ctx, graph):
+            graph.add_tasks(*[self._op(node, operation_name, arguments={'seconds': 0.1})
+                              for _ in range(3)])
+        self._execute(
+            workflow_func=mock_workflow,
+            workflow_context=workflow_context,
+            executor=executor,
+            max_concurrent_tasks=1)
+        assert workflow_context.states == ['start', 'success']
+        invocations = sorted(global_test_holder.get('invocations'))
+        assert len(invocations) == 3
+        # The tasks ran one after the other
+        assert invocations[1] - invocations[0] >= 0.09
+        assert invocations[2] - invocations[1] >= 0.09
+
 
 class TestCancel(BaseTest):
 
@@ -0,0 +1,103 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from aria.orchestrator.workflows.core import scheduling
+
+
+class _Model(object):
+    def __init__(self, model_id, **kwargs):
+        self.id = model_id
+        self.__dict__.update(kwargs)
+
+
+class _Task(object):
+    def __init__(self, task_id, dependencies=(), stub=False, node=None):
+        self.id = task_id
+        self.dependencies = list(dependencies)
+        self._stub_type = 'stub' if stub else None
+        self.node = node
+        self.relationship = None
+        self.plugin = None
+        self.interface_name = 'interface'
+        self.operation_name = 'operation'
+
+
+def test_critical_path_policy():
+    # start -> short -> end
+    # start -> long_1 -> long_2 -> long_3 -> end
+    start = _Task('start', stub=True)
+    short = _Task('short', [start])
+    long_1 = _Task('long_1', [start])
+    long_2 = _Task('long_2', [long_1])
+    long_3 = _Task('long_3', [long_2])
+    end = _Task('end', [short, long_3], stub=True)
+
+    policy = scheduling.CriticalPathPolicy()
+    policy.prepare([start, short, long_1, long_2, long_3, end])
+
+    assert policy.priority(end) == 0
+    assert policy.priority(short) == -1
+    assert policy.priority(long_3) == -1
+    assert policy.priority(long_1) == -3
+    assert policy.priority(start) == -3
+    assert sorted([short, long_1], key=policy.priority) == [long_1, short]
+
+
+def test_fifo_policy():
+    policy = scheduling.FifoPolicy()
+    tasks = [_Task('first'), _Task('second')]
+    policy.prepare(tasks)
+    assert policy.priority(tasks[0]) == policy.priority(tasks[1])
+
+
+def test_concurrency_limiter_max_tasks():
+    limiter = scheduling.ConcurrencyLimiter(max_tasks=1)
+    task, other_task, stub_task = _Task('task'), _Task('other_task'), _Task('stub', stub=True)
+    assert limiter.admit(task)
+    assert not limiter.admit(other_task)
+    assert limiter.admit(stub_task)
+    limiter.release(task)
+    assert limiter.admit(other_task)
+
+
+def test_concurrency_limiter_per_host():
+    host_1 = _Model('host_1', host=None)
+    host_2 = _Model('host_2', host=None)
+    hosted_1 = _Model('hosted_1', host=host_1)
+    limiter = scheduling.ConcurrencyLimiter(limits={'host': 1})
+    task_1, task_2, task_3 = _Task('1', node=host_1), _Task('2', node=hosted_1), \
+        _Task('3', node=host_2)
+    assert limiter.admit(task_1)
+    assert not limiter.admit(task_2)
+    assert limiter.admit(task_3)
+    limiter.release(task_1)
+    assert limiter.admit(task_2)
+
+
+def test_concurrency_limiter_unsupported_key():
+    with pytest.raises(ValueError):
+        scheduling.ConcurrencyLimiter(limits={'color': 1})
+
+
+@pytest.mark.parametrize('kwargs', [
+    dict(max_tasks=0),
+    dict(limits={'host': 0}),
+    dict(limits={'plugin': -1})
+])
+def test_concurrency_limiter_limit_below_one(kwargs):
+    with pytest.raises(ValueError):
+        scheduling.ConcurrencyLimiter(**kwargs)
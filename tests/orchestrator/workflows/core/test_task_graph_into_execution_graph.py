@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import pytest
 from networkx import topological_sort, DiGraph
 
 from aria.modeling import models
@@ -24,7 +25,8 @@ from tests import mock
 from tests import storage
 
 
-def test_task_graph_into_execution_graph(tmpdir):
+@pytest.mark.parametrize('bulk', [True, False])
+def test_task_graph_into_execution_graph(tmpdir, bulk):
     interface_name = 'Standard'
     op1_name, op2_name, op3_name = 'create', 'configure', 'start'
     workflow_context = mock.context.simple(str(tmpdir))
@@ -80,7 +82,7 @@ def test_task_graph_into_execution_graph(tmpdir):
     test_task_graph.add_dependency(inner_task_graph, simple_before_task)
     test_task_graph.add_dependency(simple_after_task, inner_task_graph)
 
-    compiler = graph_compiler.GraphCompiler(workflow_context, base.StubTaskExecutor)
+    compiler = graph_compiler.GraphCompiler(workflow_context, base.StubTaskExecutor, bulk=bulk)
     compiler.compile(test_task_graph)
 
     execution_tasks = topological_sort(_graph(workflow_context.execution.tasks))
@@ -17,6 +17,7 @@ import os
 import sys
 import time
 import Queue
+import socket
 import subprocess
 
 import pytest
@@ -117,6 +118,58 @@ while True:
                 assert pid not in psutil.pids()
 
 
+class TestProcessExecutorWorkerPool(object):
+
+    def test_worker_reused(self, plugin_manager, model, queue, fs_test_holder):
+        pids = self._execute_tasks(plugin_manager, model, queue, fs_test_holder,
+                                   worker_pool_size=1)
+        assert len(set(pids)) == 1
+        assert os.getpid() not in pids
+
+    def test_worker_recycled(self, plugin_manager, model, queue, fs_test_holder):
+        pids = self._execute_tasks(plugin_manager, model, queue, fs_test_holder,
+                                   worker_pool_size=1, max_tasks_per_worker=1)
+        assert len(set(pids)) == 2
+
+    def test_connection_without_token_rejected(self, plugin_manager):
+        executor = process.ProcessExecutor(plugin_manager=plugin_manager,
+                                           python_path=[tests.ROOT_DIR],
+                                           worker_pool_size=1)
+        try:
+            # The pooled worker was spawned as worker "1"
+            connection = socket.create_connection(('localhost', executor._server_port))
+            try:
+                process._send_frame(connection, '1 not-the-token')
+                connection.settimeout(60)
+                assert connection.recv(1) == ''
+            finally:
+                connection.close()
+        finally:
+            executor.close()
+
+    @staticmethod
+    def _execute_tasks(plugin_manager, model, queue, fs_test_holder, **executor_kwargs):
+        executor = process.ProcessExecutor(plugin_manager=plugin_manager,
+                                           python_path=[tests.ROOT_DIR],
+                                           **executor_kwargs)
+        try:
+            for key in ('first', 'second'):
+                holder_path_argument = models.Argument.wrap('holder_path', fs_test_holder._path)
+                key_argument = models.Argument.wrap('key', key)
+                model.argument.put(holder_path_argument)
+                model.argument.put(key_argument)
+                executor.execute(MockContext(
+                    model,
+                    task_kwargs=dict(
+                        function='{0}.{1}'.format(__name__, pid_task.__name__),
+                        arguments=dict(holder_path=holder_path_argument, key=key_argument))
+                ))
+                assert queue.get(timeout=60) is None
+        finally:
+            executor.close()
+        return [fs_test_holder['first'], fs_test_holder['second']]
+
+
 @pytest.fixture
 def queue():
     _queue = Queue.Queue()
@@ -164,6 +217,11 @@ def model(tmpdir):
     tests.storage.release_sqlite_storage(_storage)
 
 
+@operation
+def pid_task(holder_path, key, **_):
+    FilesystemDataHolder(holder_path)[key] = os.getpid()
+
+
 @operation
 def freezing_task(holder_path, freezing_script_path, **_):
     holder = FilesystemDataHolder(holder_path)
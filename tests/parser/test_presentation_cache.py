@@ -0,0 +1,77 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from aria.parser.loading import LiteralLocation
+from aria.parser.presentation import PresentationCache
+from aria.utils.collections import deepcopy_with_locators
+
+from .utils import create_context, create_consumer
+
+
+TEMPLATE = """
+tosca_definitions_version: tosca_simple_yaml_1_0
+node_types:
+  MyNode:
+    derived_from: tosca.nodes.Root
+    properties:
+      my_property:
+        type: string
+topology_template:
+  node_templates:
+    my_node:
+      type: MyNode
+      properties:
+        my_property: value
+"""
+
+
+def test_imports_are_cached(tmpdir):
+    cache = PresentationCache()
+    context = _consume(cache)
+    assert cache._presentations
+    cached = dict((k, deepcopy_with_locators(v[1]._raw)) for k, v in cache._presentations.items())
+
+    second_context = _consume(cache)
+    assert second_context.presentation.presenter._raw == context.presentation.presenter._raw
+    # Merging must not have modified the cached presentations
+    for key, (_, presentation) in cache._presentations.items():
+        assert presentation._raw == cached[key]
+
+    disk_cache = PresentationCache(str(tmpdir))
+    _consume(disk_cache)
+    assert tmpdir.listdir()
+    # A new process-wide cache is filled from disk
+    other_disk_cache = PresentationCache(str(tmpdir))
+    disk_context = _consume(other_disk_cache)
+    assert disk_context.presentation.presenter._raw == context.presentation.presenter._raw
+
+
+def test_cached_presentations_do_not_keep_contexts():
+    cache = PresentationCache()
+    context = _consume(cache)
+    _consume(cache)
+    for _, presentation in cache._presentations.values():
+        for _, args, _ in getattr(presentation, '_method_cache', {}):
+            assert context not in args
+
+
+def _consume(cache):
+    context = create_context(LiteralLocation(TEMPLATE))
+    context.presentation.cache = cache
+    consumer, _ = create_consumer(context, 'instance')
+    consumer.consume()
+    context.validation.dump_issues()
+    assert not context.validation.has_issues
+    return context
@@ -0,0 +1,48 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from aria.parser.loading import LiteralLocation, LiteralLoader
+from aria.parser.reading import ReadingContext, ReaderCache, YamlReader
+
+
+YAML = """
+my_map:
+  my_list: [1, 2]
+  my_string: value
+"""
+
+
+def test_reader_cache(tmpdir, monkeypatch):
+    raw = _read(ReaderCache(str(tmpdir)))
+    assert tmpdir.listdir()
+
+    # Unchanged data is not parsed again
+    def _read_yaml(*_):
+        raise AssertionError('YAML was parsed')
+    monkeypatch.setattr(YamlReader, '_read', _read_yaml)
+    cached_raw = _read(ReaderCache(str(tmpdir)))
+    assert cached_raw == raw
+    assert cached_raw['my_map']['my_list'] == [1, 2]
+    locator = raw._locator.children['my_map'].children['my_string']
+    cached_locator = cached_raw._locator.children['my_map'].children['my_string']
+    assert (cached_locator.line, cached_locator.column) == (locator.line, locator.column)
+
+
+def _read(cache):
+    context = ReadingContext()
+    context.cache = cache
+    location = LiteralLocation(YAML)
+    reader = YamlReader(context, location, LiteralLoader(location))
+    return reader.read()
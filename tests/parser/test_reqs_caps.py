@@ -13,6 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from aria.orchestrator.topology import Topology
+
 from .service_templates import consume_test_case
 from ..helpers import get_service_template_uri
 
@@ -21,8 +23,20 @@ def test_satisfy_capability_type():
     consume_reqs_caps_template1('instance')
 
 
+def test_satisfy_requirements_concurrently():
+    context, _ = consume_reqs_caps_template1('template')
+    topology = Topology()
+    service = topology.instantiate(context.modeling.template, inputs={})
+    assert topology.satisfy_requirements(service, threads=4)
+    assert not topology.has_issues
+    plug = [node for node in service.nodes.itervalues() if node.node_template.name == 'plug'][0]
+    relationship = plug.outbound_relationships[0]
+    assert relationship.target_node.node_template.name == 'socket'
+    assert relationship.target_capability.name == 'socket'
+
+
 def consume_reqs_caps_template1(consumer_class_name, cache=True):
-    consume_test_case(
+    return consume_test_case(
         get_service_template_uri('tosca-simple-1.0', 'reqs_caps', 'reqs_caps1.yaml'),
         consumer_class_name=consumer_class_name,
         cache=cache
@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 from shutil import rmtree
 from tempfile import mkdtemp
 
@@ -23,6 +24,12 @@ from sqlalchemy import (
     MetaData
 )
 
+from aria.storage import sql_mapi
+
+# Tests that use a file-based model storage run against this database server instead if set (e.g.
+# "postgresql://aria@localhost/aria_test"); see the py27postgresql tox environment
+DATABASE_URL = os.environ.get('ARIA_TEST_DATABASE_URL')
+
 
 class TestFileSystem(object):
 
@@ -40,7 +47,23 @@ def release_sqlite_storage(storage):
     :return:
     """
     storage._all_api_kwargs['session'].close()
-    MetaData(bind=storage._all_api_kwargs['engine']).drop_all()
+    if storage._all_api_kwargs.get('read_session') is not None:
+        storage._all_api_kwargs['read_session'].close()
+    metadata = MetaData(bind=storage._all_api_kwargs['engine'])
+    if DATABASE_URL:
+        # The database outlives the test
+        metadata.reflect()
+    metadata.drop_all()
+
+
+def get_model_storage_initiator(base_dir):
+    """
+    Returns the initiator, and its kwargs, of a file-based model storage (or of the database server
+    storage, if one is configured).
+    """
+    if DATABASE_URL:
+        return sql_mapi.init_server_storage, dict(url=DATABASE_URL)
+    return sql_mapi.init_storage, dict(base_dir=base_dir)
 
 
 def init_inmemory_model_storage():
@@ -13,18 +13,29 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import threading
+import time
+from datetime import datetime
+
 import pytest
 
 from sqlalchemy import (
     Column,
     Integer,
-    Text
+    Text,
+    create_engine,
+    event,
+    inspect,
+    pool,
+    select
 )
 
 from aria import (
     application_model_storage,
     modeling
 )
+from aria.modeling import models
 from aria.storage import (
     ModelStorage,
     exceptions,
@@ -71,6 +82,34 @@ def test_model_storage(storage):
         storage.mock_model.get(mock_model.id)
 
 
+def test_model_storage_batch(storage):
+    with storage.batch():
+        first = tests_modeling.MockModel(value=0, name='first')
+        storage.mock_model.put(first)
+        # New entries get their IDs before the batch ends
+        assert first.id is not None
+        with storage.batch():
+            storage.mock_model.put(tests_modeling.MockModel(value=1, name='second'))
+
+    # Nothing should be left to roll back once the batch ended
+    storage.mock_model._session.rollback()
+    assert sorted(mm.name for mm in storage.mock_model.iter()) == ['first', 'second']
+
+
+def test_model_storage_batch_rollback(storage):
+    with pytest.raises(RuntimeError):
+        with storage.batch():
+            storage.mock_model.put(tests_modeling.MockModel(value=0, name='model_name'))
+            raise RuntimeError()
+
+    assert list(storage.mock_model.iter()) == []
+
+    # Changes after the batch are committed right away again
+    storage.mock_model.put(tests_modeling.MockModel(value=0, name='model_name'))
+    storage.mock_model._session.rollback()
+    assert len(storage.mock_model.list()) == 1
+
+
 def test_application_storage_factory():
     storage = application_model_storage(sql_mapi.SQLAlchemyModelAPI,
                                         initiator=tests_storage.init_inmemory_model_storage)
@@ -162,6 +201,27 @@ def test_mapi_include(context):
     assert_include(service2)
 
 
+def test_mapi_include_related(context):
+    service_id = context.model.service.list()[0].id
+    context.model.service._session.expunge_all()
+
+    service = context.model.service.get(service_id,
+                                        include_related=('nodes', 'nodes.node_template'))
+    assert 'nodes' not in inspect(service).unloaded
+    for node in service.nodes.itervalues():
+        assert 'node_template' not in inspect(node).unloaded
+
+    for service in context.model.service.iter(include_related=('service_template',)):
+        assert 'service_template' not in inspect(service).unloaded
+
+
+def test_mapi_include_related_errors(context):
+    with pytest.raises(exceptions.StorageError):
+        context.model.service.list(include_related=('no_such_relationship',))
+    with pytest.raises(exceptions.StorageError):
+        context.model.service.list(include=('name',), include_related=('nodes',))
+
+
 class MockModel(modeling.models.aria_declarative_base, modeling.mixins.ModelMixin): #pylint: disable=abstract-method
     __tablename__ = 'op_mock_model'
 
@@ -211,3 +271,231 @@ class TestFilterOperands(object):
     def test_eq_and_ne(self, storage):
         assert len(storage.op_mock_model.list(filters=dict(value=dict(eq=1, ne=3)))) == 1
         assert len(storage.op_mock_model.list(filters=dict(value=dict(eq=1, ne=1)))) == 0
+
+
+class TestBatches(object):
+
+    @pytest.fixture()
+    def storage(self):
+        model_storage = application_model_storage(
+            sql_mapi.SQLAlchemyModelAPI, initiator=tests_storage.init_inmemory_model_storage)
+        model_storage.register(MockModel)
+        for value in (1, 2, 3, 4, 5):
+            model_storage.op_mock_model.put(MockModel(value=value))
+        yield model_storage
+        tests_storage.release_sqlite_storage(model_storage)
+
+    @pytest.mark.parametrize('batch_size', [1, 2, 5, 10])
+    def test_iter_batches(self, storage, batch_size):
+        values = [m.value for m in storage.op_mock_model.iter(batch_size=batch_size)]
+        assert values == [1, 2, 3, 4, 5]
+
+    def test_iter_batches_with_filters(self, storage):
+        models = storage.op_mock_model.iter(filters=dict(value=dict(gt=2)), batch_size=2)
+        assert [m.value for m in models] == [3, 4, 5]
+
+    def test_iter_batches_with_sort(self, storage):
+        with pytest.raises(exceptions.StorageError):
+            list(storage.op_mock_model.iter(sort=dict(value='desc'), batch_size=2))
+
+    def test_iter_batches_with_include(self, storage):
+        with pytest.raises(exceptions.StorageError):
+            list(storage.op_mock_model.iter(include=('value',), batch_size=2))
+
+    def test_list_without_count(self, storage):
+        result = storage.op_mock_model.list(pagination=dict(size=2, offset=1, count=False))
+        assert [m.value for m in result] == [2, 3]
+        assert result.metadata['total'] is None
+
+
+class TestSQLiteStorage(object):
+
+    @pytest.fixture(params=sorted(sql_mapi.SQLITE_PROFILES))
+    def storage(self, request, tmpdir):
+        model_storage = _create_sqlite_storage(str(tmpdir), request.param)
+        model_storage.register(MockModel)
+        yield model_storage
+        tests_storage.release_sqlite_storage(model_storage)
+
+    def test_profile_pragmas(self, storage):
+        profile = storage.serialization_dict['initiator_kwargs']['profile']
+        with storage.op_mock_model._engine.connect() as connection:
+            journal_mode = connection.scalar('PRAGMA journal_mode')
+        assert journal_mode == ('wal' if profile == 'performance' else 'delete')
+
+    def test_unknown_profile(self, tmpdir):
+        with pytest.raises(exceptions.StorageError):
+            sql_mapi.init_storage(str(tmpdir), profile='no_such_profile')
+
+    def test_read_only(self, storage):
+        model = MockModel(value=1)
+        storage.op_mock_model.put(model)
+        read_only = storage.op_mock_model.read_only
+        assert read_only is not storage.op_mock_model
+        assert [m.value for m in read_only.list()] == [1]
+
+        # Changes committed by the session are seen by the read-only session
+        model.value = 2
+        storage.op_mock_model.update(model)
+        assert read_only.get(model.id).value == 2
+
+        with pytest.raises(exceptions.StorageError):
+            read_only.put(MockModel(value=3))
+
+    def test_read_only_fallback(self):
+        model_storage = application_model_storage(
+            sql_mapi.SQLAlchemyModelAPI, initiator=tests_storage.init_inmemory_model_storage)
+        assert model_storage.execution.read_only is model_storage.execution
+        tests_storage.release_sqlite_storage(model_storage)
+
+    @pytest.mark.parametrize('profile', sorted(sql_mapi.SQLITE_PROFILES))
+    def test_task_transitions_with_concurrent_log_writers(self, tmpdir, profile):
+        # Task transitions (with the engine's cancel check) while other threads write logs: nothing
+        # fails on a locked database, and every cancel check is a single query of its own session
+        # (rather than a refresh of the execution through the session of the transitions)
+        statements, _ = _run_task_transitions(str(tmpdir), profile, transitions_count=300)
+        assert statements['read'] == 300
+        assert statements['write'] <= 2 * 300
+
+    @pytest.mark.skipif(not os.environ.get('ARIA_BENCHMARK'),
+                        reason='benchmark; set ARIA_BENCHMARK and run pytest with -s to see the '
+                               'throughput')
+    @pytest.mark.parametrize('profile', sorted(sql_mapi.SQLITE_PROFILES))
+    def test_task_transitions_benchmark(self, tmpdir, profile):
+        transitions_count = 3000
+        _, duration = _run_task_transitions(str(tmpdir), profile, transitions_count,
+                                            logs_count=3000)
+        print '\n{0} profile: {1:.0f} task transitions per second'.format(
+            profile, transitions_count / duration)
+
+
+class TestServerStorage(object):
+
+    @pytest.fixture(autouse=True)
+    def engine_kwargs(self, monkeypatch):
+        # Server databases are stood in for by in-memory SQLite ones (which do not support pool
+        # settings), so the settings are recorded instead
+        engine_kwargs = []
+
+        def mock_create_engine(url, **kwargs):
+            engine_kwargs.append(kwargs)
+            return create_engine('sqlite://')
+        monkeypatch.setattr(sql_mapi, 'create_engine', mock_create_engine)
+        monkeypatch.setattr(sql_mapi, '_shared_engines', {})
+        return engine_kwargs
+
+    def test_pool_settings(self, engine_kwargs):
+        sql_mapi.init_server_storage('postgresql://localhost/aria', pool_size=2, max_overflow=3,
+                                     pool_timeout=4, pool_recycle=5)
+        assert engine_kwargs == [dict(pool_size=2, max_overflow=3, pool_timeout=4,
+                                      pool_recycle=5)]
+
+    def test_pre_ping_setting(self):
+        engine = sql_mapi.init_server_storage('postgresql://localhost/aria')['engine']
+        assert event.contains(engine, 'engine_connect', sql_mapi._ping_connection)
+        engine = sql_mapi.init_server_storage('postgresql://localhost/aria',
+                                              pool_pre_ping=False)['engine']
+        assert not event.contains(engine, 'engine_connect', sql_mapi._ping_connection)
+
+    def test_engine_shared(self):
+        storage1 = sql_mapi.init_server_storage('postgresql://localhost/aria')
+        storage2 = sql_mapi.init_server_storage('postgresql://localhost/aria')
+        storage3 = sql_mapi.init_server_storage('postgresql://localhost/aria', pool_size=1)
+        assert storage1['engine'] is storage2['engine']
+        assert storage1['engine'] is not storage3['engine']
+        assert storage1['session'] is not storage2['session']
+
+    def test_dispose_shared_engine(self, mocker):
+        engine = sql_mapi.init_server_storage('postgresql://localhost/aria')['engine']
+        dispose = mocker.patch.object(engine, 'dispose')
+        sql_mapi.dispose_engine(engine)
+        assert not dispose.called
+
+    def test_pre_ping(self, tmpdir):
+        # The pool keeps connections, as it would for a server
+        engine = create_engine('sqlite:///{0}'.format(tmpdir.join('db.sqlite')),
+                               poolclass=pool.QueuePool)
+        event.listen(engine, 'engine_connect', sql_mapi._ping_connection)
+        with engine.connect() as connection:
+            dropped_connection = connection.connection.connection
+        # As if the server dropped the pooled connection
+        dropped_connection.close()
+        with engine.connect() as connection:
+            assert connection.connection.connection is not dropped_connection
+            assert connection.scalar(select([1])) == 1
+
+    def test_model_storage(self):
+        storage = application_model_storage(
+            sql_mapi.SQLAlchemyModelAPI,
+            initiator=sql_mapi.init_server_storage,
+            initiator_kwargs=dict(url='postgresql://localhost/aria'))
+        storage.register(MockModel)
+        storage.op_mock_model.put(MockModel(value=1))
+        assert [m.value for m in storage.op_mock_model.list()] == [1]
+        tests_storage.release_sqlite_storage(storage)
+
+
+def _create_sqlite_storage(base_dir, profile):
+    return application_model_storage(sql_mapi.SQLAlchemyModelAPI,
+                                     initiator=sql_mapi.init_storage,
+                                     initiator_kwargs=dict(base_dir=base_dir, profile=profile))
+
+
+def _run_task_transitions(base_dir, profile, transitions_count, writers_count=4,
+                          logs_count=300):
+    # Returns the statements executed by the transitions, by engine, and their duration in seconds
+    storage = _create_sqlite_storage(base_dir, profile)
+    service = storage.service.get(mock.topology.create_simple_topology_two_nodes(storage))
+    execution = mock.models.create_execution(service)
+    storage.execution.put(execution)
+    task = models.Task(node=service.nodes.values()[0], execution=execution)
+    storage.task.put(task)
+    execution_id, task_id = execution.id, task.id
+
+    errors = []
+
+    def write_logs():
+        try:
+            for i in range(logs_count):
+                storage.log.put(models.Log(execution_fk=execution_id, task_fk=task_id,
+                                           level='INFO', msg='log {0}'.format(i),
+                                           created_at=datetime.utcnow()))
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            storage.log._session.remove()
+
+    # Statements executed by this thread, by engine
+    statements = dict(read=0, write=0)
+    main_thread = threading.current_thread()
+
+    def count_statements(name):
+        def before_cursor_execute(*_):
+            if threading.current_thread() is main_thread:
+                statements[name] += 1
+        return before_cursor_execute
+
+    read_engine = storage.execution.read_only._session.bind
+    event.listen(read_engine, 'before_cursor_execute', count_statements('read'))
+    event.listen(storage.task._engine, 'before_cursor_execute', count_statements('write'))
+
+    writers = [threading.Thread(target=write_logs) for _ in range(writers_count)]
+    for writer in writers:
+        writer.start()
+    statuses = (models.Task.SENT, models.Task.STARTED, models.Task.SUCCESS)
+    start = time.time()
+    for i in range(transitions_count):
+        storage.execution.read_only.get(execution_id, include=('status',))
+        task.status = statuses[i % len(statuses)]
+        storage.task.update(task)
+    duration = time.time() - start
+    for writer in writers:
+        writer.join()
+
+    try:
+        assert not errors
+        assert storage.log.list(pagination=dict(size=1)).metadata['total'] == \
+            writers_count * logs_count
+        return statements, duration
+    finally:
+        tests_storage.release_sqlite_storage(storage)
@@ -154,3 +154,25 @@ class TestRegistrar(object):
         assert extension_registration.list_based_registrar() == []
         extension_registration.init()
         assert extension_registration.list_based_registrar() == []
+
+    def test_init_after_more_registrations(self):
+        class ExtensionRegistration(extension._ExtensionRegistration):
+            @extension._registrar
+            def list_based_registrar(*_):
+                return []
+        extension_registration = ExtensionRegistration()
+
+        @extension_registration
+        class Extension1(object):
+            def list_based_registrar(self):
+                return 1
+
+        extension_registration.init()
+
+        @extension_registration
+        class Extension2(object):
+            def list_based_registrar(self):
+                return 2
+
+        extension_registration.init()
+        assert extension_registration.list_based_registrar() == [1, 2]
@@ -14,13 +14,27 @@
 # limitations under the License.
 
 import logging
+import time
 
+import pytest
+
+from aria import (
+    application_model_storage,
+    modeling
+)
 from aria.logger import (create_logger,
                          create_console_log_handler,
                          create_file_log_handler,
+                         create_sqla_log_handler,
                          _default_file_formatter,
                          LoggerMixin,
                          _DefaultConsoleFormat)
+from aria.storage import sql_mapi
+
+from tests import (
+    mock,
+    storage as tests_storage
+)
 
 
 def test_create_logger():
@@ -127,3 +141,69 @@ def test_loggermixin(capsys):
     # class_unpickled = pickle.loads(class_pickled)
     #
     # assert vars(class_unpickled) == vars(custom_class)
+
+
+@pytest.fixture
+def model():
+    model_storage = application_model_storage(sql_mapi.SQLAlchemyModelAPI,
+                                              initiator=tests_storage.init_inmemory_model_storage)
+    yield model_storage
+    tests_storage.release_sqlite_storage(model_storage)
+
+
+@pytest.fixture
+def execution_id(model):
+    service = model.service.get(mock.topology.create_simple_topology_two_nodes(model))
+    execution = mock.models.create_execution(service)
+    model.execution.put(execution)
+    return execution.id
+
+
+@pytest.fixture
+def sqla_logger():
+    logger = logging.getLogger('test_sqla_logger')
+    original_level = logger.level
+    logger.setLevel(logging.DEBUG)
+    yield logger
+    logger.setLevel(original_level)
+
+
+def test_create_sqla_log_handler(model, execution_id, sqla_logger):
+    handler = create_sqla_log_handler(model=model,
+                                      log_cls=modeling.models.Log,
+                                      execution_id=execution_id,
+                                      batch_size=2,
+                                      flush_interval=60)
+    sqla_logger.addHandler(handler)
+    try:
+        sqla_logger.info('first', extra=dict(task_id=None))
+        # Buffered until the batch is full
+        assert len(model.log.list()) == 0
+        sqla_logger.info('second', extra=dict(task_id=None))
+        assert [log.msg for log in model.log.list()] == ['first', 'second']
+
+        sqla_logger.info('third', extra=dict(task_id=None))
+        handler.flush()
+        assert len(model.log.list()) == 3
+    finally:
+        sqla_logger.removeHandler(handler)
+        handler.close()
+
+
+def test_sqla_log_handler_writes_old_records(model, execution_id, sqla_logger):
+    handler = create_sqla_log_handler(model=model,
+                                      log_cls=modeling.models.Log,
+                                      execution_id=execution_id,
+                                      batch_size=100,
+                                      flush_interval=0.1)
+    sqla_logger.addHandler(handler)
+    try:
+        sqla_logger.info('first', extra=dict(task_id=None))
+        assert len(model.log.list()) == 0
+        # The batch is not full, but the first record is older than the flush interval
+        time.sleep(0.2)
+        sqla_logger.info('second', extra=dict(task_id=None))
+        assert [log.msg for log in model.log.list()] == ['first', 'second']
+    finally:
+        sqla_logger.removeHandler(handler)
+        handler.close()
@@ -0,0 +1,40 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from aria.utils.caching import (load_pickle, store_pickle)
+
+
+def test_store_and_load_pickle(tmpdir):
+    path = str(tmpdir.join('cache', 'entry.pickle'))
+    assert load_pickle(path) is None
+    store_pickle(path, {'key': [1, 2]})
+    assert load_pickle(path) == {'key': [1, 2]}
+
+
+def test_store_pickle_onto_existing_file(tmpdir):
+    path = str(tmpdir.join('entry.pickle'))
+    store_pickle(path, 'first')
+    store_pickle(path, 'second')
+    assert load_pickle(path) in ('first', 'second')
+    # No temporary files are left behind
+    assert os.listdir(str(tmpdir)) == ['entry.pickle']
+
+
+def test_load_unreadable_pickle(tmpdir):
+    path = tmpdir.join('entry.pickle')
+    path.write('not a pickle')
+    assert load_pickle(str(path)) is None